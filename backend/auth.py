@@ -1,123 +1,318 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import NamedTuple, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import jwt
+from cachetools import TLRUCache, TTLCache
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 
-from config import settings
-from database import get_db
+from config import SECRET_KEY, ALGORITHM, ACCESS_TTL_S, REFRESH_TTL_S
+from database import get_async_db
 from models import User, RefreshToken
 from schemas import TokenData
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: Argon2id for new hashes; legacy bcrypt hashes still verify
+# and are upgraded on the next successful login (see authenticate_user).
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated=["bcrypt"],
+    argon2__type="ID",
+    argon2__memory_cost=46 * 1024,  # KiB, OWASP minimum for Argon2id
+    argon2__time_cost=2,
+    argon2__parallelism=1,
+)
+
+# Hashing is deliberately CPU-heavy; run it on a dedicated pool so signup and
+# login bursts neither block the event loop nor starve the default executor.
+_password_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count(), thread_name_prefix="password-hash"
+)
 
 # Security scheme
 security = HTTPBearer()
 
+# JWT signing key and decode parameters, built once instead of per request
+JWT_KEY = SECRET_KEY.encode()
+JWT_ALGORITHMS = [ALGORITHM]
+JWT_DECODE_OPTIONS = {"require": ["exp", "sub", "type"]}
+JWT_DECODE_OPTIONS_NO_EXP = {"verify_exp": False}
+
+# Verified access tokens keyed by SHA-256 of the raw token. An entry lives for
+# ACCESS_TOKEN_CACHE_TTL seconds or until the token's own `exp`, whichever is
+# sooner, so a cached verification never outlives the token itself.
+#
+# Plain dict lookups on the digest are safe here and must not be replaced with
+# hmac.compare_digest: the key is a hash of caller-supplied input, not a stored
+# secret, so lookup timing reveals nothing an attacker doesn't already hold,
+# and a constant-time scan would turn the O(1) lookup into O(n). Constant-time
+# comparison only matters when checking user input against a stored secret;
+# refresh tokens avoid that entirely by being looked up by their signed jti.
+ACCESS_TOKEN_CACHE_TTL = 60
+_access_token_cache = TLRUCache(
+    maxsize=50_000,
+    ttu=lambda _key, value, now: min(now + ACCESS_TOKEN_CACHE_TTL, value[1]),
+    timer=time.time,
+)
+_access_token_cache_lock = threading.Lock()
+
+# Recently revoked refresh-token jtis, so replays of a rotated or logged-out
+# token are rejected without a database round-trip.
+_revoked_refresh_cache = TTLCache(maxsize=10_000, ttl=120)
+_refresh_cache_lock = threading.Lock()
+
+# Expired refresh tokens are kept this long before purge_refresh_tokens removes them
+REFRESH_TOKEN_RETENTION = timedelta(days=7)
+
+# Authenticated principals keyed by user id, so most requests skip the user
+# lookup. Bans, demotions and deletions call invalidate_cached_principal; other
+# workers pick them up within PRINCIPAL_CACHE_TTL seconds.
+PRINCIPAL_CACHE_TTL = 30
+_principal_cache = TTLCache(maxsize=10_000, ttl=PRINCIPAL_CACHE_TTL)
+_principal_cache_lock = threading.Lock()
+
+
+# Auth failures get a fresh exception per raise: re-raising one shared
+# instance would keep chaining tracebacks (and request frames) onto it
+_BEARER_CHALLENGE = {"WWW-Authenticate": "Bearer"}
+
+
+def _credentials_exc() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers=_BEARER_CHALLENGE,
+    )
+
+
+def _user_not_found_exc() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="User not found"
+    )
+
+
+def _inactive_exc() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="User account is inactive"
+    )
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    # Truncate password to 72 bytes for bcrypt compatibility
-    # passlib's bcrypt handler accepts bytes directly
-    if isinstance(plain_password, str):
-        plain_password = plain_password.encode('utf-8')[:72]
+    if pwd_context.identify(hashed_password) == "bcrypt":
+        # Legacy bcrypt hashes were created from the first 72 bytes only
+        return pwd_context.verify(plain_password.encode('utf-8')[:72], hashed_password)
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    # Truncate password to 72 bytes for bcrypt compatibility
-    # passlib's bcrypt handler accepts bytes directly
-    if isinstance(password, str):
-        password = password.encode('utf-8')[:72]
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password-hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the password-hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+
+def shutdown_password_executor() -> None:
+    """Stop the password-hashing pool."""
+    _password_executor.shutdown(wait=False)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+    ttl = int(expires_delta.total_seconds()) if expires_delta else ACCESS_TTL_S
     
-    to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    # JWT exp is an epoch int; skip building datetimes for the library to convert back
+    to_encode.update({"exp": int(time.time()) + ttl, "type": "access"})
+    encoded_jwt = jwt.encode(to_encode, JWT_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def create_refresh_token(user_id: uuid.UUID, db: Session) -> str:
-    """Create a refresh token and store it in the database."""
-    expires_delta = timedelta(days=settings.refresh_token_expire_days)
-    expire = datetime.utcnow() + expires_delta
+def _encode_refresh_token(user_id: uuid.UUID) -> Tuple[str, uuid.UUID, int]:
+    """Sign a new refresh token, returning it with its jti and `exp`."""
+    expire = int(time.time()) + REFRESH_TTL_S
+    jti = uuid.uuid4()
     
     token_data = {
         "sub": str(user_id),
         "exp": expire,
-        "type": "refresh"
+        "type": "refresh",
+        "jti": str(jti)
     }
     
-    token = jwt.encode(token_data, settings.secret_key, algorithm=settings.algorithm)
+    return jwt.encode(token_data, JWT_KEY, algorithm=ALGORITHM), jti, expire
+
+
+async def create_refresh_token(user_id: uuid.UUID, db: AsyncSession, commit: bool = True) -> str:
+    """Create a refresh token and store its hash in the database.
     
-    # Store refresh token in database
+    Pass ``commit=False`` to leave the insert in the caller's transaction.
+    """
+    token, jti, expire = _encode_refresh_token(user_id)
+    
+    # Store only the token's hash, keyed by its jti
     db_token = RefreshToken(
+        id=jti,
         user_id=user_id,
-        token=token,
-        expires_at=expire
+        token_hash=_token_key(token),
+        expires_at=datetime.utcfromtimestamp(expire)
     )
     db.add(db_token)
-    db.commit()
+    if commit:
+        await db.commit()
     
     return token
 
 
+def _decode_token(token: str, token_type: str) -> Tuple[TokenData, int]:
+    """Decode a JWT, returning its token data and `exp` timestamp."""
+    try:
+        # Required claims are enforced by PyJWT during the single decode
+        payload = jwt.decode(
+            token,
+            JWT_KEY,
+            algorithms=JWT_ALGORITHMS,
+            options=JWT_DECODE_OPTIONS,
+        )
+        if payload["type"] != token_type:
+            raise _credentials_exc()
+        jti = payload.get("jti")
+        token_data = TokenData(
+            user_id=uuid.UUID(payload["sub"]),
+            jti=uuid.UUID(jti) if jti else None,
+        )
+        return token_data, payload["exp"]
+    except (jwt.PyJWTError, ValueError):
+        raise _credentials_exc()
+
+
 def verify_token(token: str, token_type: str = "access") -> TokenData:
     """Verify and decode a JWT token."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    token_data, _ = _decode_token(token, token_type)
+    return token_data
+
+
+def verify_access_token_cached(token: str) -> TokenData:
+    """Verify an access token, reusing the result of earlier verifications."""
+    key = _token_key(token)
+    with _access_token_cache_lock:
+        cached = _access_token_cache.get(key)
+    if cached is not None:
+        return cached[0]
     
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: str = payload.get("sub")
-        token_type_claim: str = payload.get("type")
-        
-        if user_id is None or token_type_claim != token_type:
-            raise credentials_exception
-        
-        token_data = TokenData(user_id=uuid.UUID(user_id))
-        return token_data
-    except JWTError:
-        raise credentials_exception
-
-
-def get_current_user(
+    token_data, expires_at = _decode_token(token, "access")
+    with _access_token_cache_lock:
+        _access_token_cache[key] = (token_data, expires_at)
+    return token_data
+
+
+class CurrentPrincipal(NamedTuple):
+    """The authenticated caller, for endpoints that don't need the full user row."""
+    id: uuid.UUID
+    email: str
+    is_active: bool
+    is_superuser: bool
+    roles_mask: int
+    
+    def has_role(self, bit: int) -> bool:
+        """Test a ROLE_* bit, like User.has_role."""
+        return bool(self.roles_mask & bit)
+
+
+_PRINCIPAL_QUERY = select(
+    User.id, User.email, User.is_active, User.is_superuser, User.roles_mask
+).where(User.id == bindparam("user_id"))
+
+
+async def get_current_principal(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentPrincipal:
+    """Get the authenticated caller, loading only the columns auth needs.
+    
+    The result is memoized on ``request.state`` for the rest of the request
+    and cached per user for PRINCIPAL_CACHE_TTL seconds across requests.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    
+    token_data = verify_access_token_cached(credentials.credentials)
+    
+    with _principal_cache_lock:
+        principal = _principal_cache.get(token_data.user_id)
+    if principal is None:
+        result = await db.execute(_PRINCIPAL_QUERY, {"user_id": token_data.user_id})
+        row = result.first()
+        if row is None:
+            raise _user_not_found_exc()
+        principal = CurrentPrincipal(*row)
+        with _principal_cache_lock:
+            _principal_cache[principal.id] = principal
+    
+    if not principal.is_active:
+        raise _inactive_exc()
+    
+    request.state.principal = principal
+    return principal
+
+
+def invalidate_cached_principal(user_id: uuid.UUID) -> None:
+    """Drop a user's cached principal after changing or deleting the user."""
+    with _principal_cache_lock:
+        _principal_cache.pop(user_id, None)
+
+
+async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
-    """Get the current authenticated user."""
-    token = credentials.credentials
-    token_data = verify_token(token)
+    """Get the current authenticated user.
     
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    The result is memoized on ``request.state`` for the rest of the request.
+    """
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+    
+    token_data = verify_access_token_cached(credentials.credentials)
+    
+    user = await db.get(User, token_data.user_id)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
+        raise _user_not_found_exc()
     
     if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User account is inactive"
-        )
+        raise _inactive_exc()
     
+    request.state.user = user
     return user
 
 
@@ -128,23 +323,120 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     return current_user
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate a user with email and password."""
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
     if not user:
         return None
     if not user.hashed_password:  # OAuth user trying to use password
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
+    if pwd_context.needs_update(user.hashed_password):
+        # Opportunistically rehash legacy bcrypt hashes to Argon2id
+        user.hashed_password = await get_password_hash_async(password)
+        await db.commit()
     return user
 
 
-def revoke_refresh_token(db: Session, token: str) -> bool:
+def _refresh_token_jti(token: str) -> Optional[uuid.UUID]:
+    """Return the jti of a correctly signed refresh token, even if expired."""
+    try:
+        payload = jwt.decode(
+            token,
+            JWT_KEY,
+            algorithms=JWT_ALGORITHMS,
+            options=JWT_DECODE_OPTIONS_NO_EXP,
+        )
+        return uuid.UUID(payload["jti"])
+    except (jwt.PyJWTError, KeyError, ValueError):
+        return None
+
+
+def _mark_refresh_revoked(jti: uuid.UUID) -> None:
+    with _refresh_cache_lock:
+        _revoked_refresh_cache[jti] = True
+
+
+# Revoke a live refresh token and insert its replacement for the same user in
+# one statement; no row comes back if the old token is unknown or already used.
+_revoked_token = (
+    update(RefreshToken)
+    .where(
+        RefreshToken.id == bindparam("old_jti"),
+        RefreshToken.user_id == bindparam("user_id"),
+        RefreshToken.is_revoked == False,
+    )
+    .values(is_revoked=True)
+    .returning(RefreshToken.user_id)
+    .cte("revoked_token")
+)
+_ROTATE_REFRESH_TOKEN = (
+    insert(RefreshToken)
+    .from_select(
+        ["id", "user_id", "token_hash", "expires_at"],
+        select(
+            bindparam("new_jti", type_=RefreshToken.id.type),
+            _revoked_token.c.user_id,
+            bindparam("token_hash", type_=RefreshToken.token_hash.type),
+            bindparam("expires_at", type_=RefreshToken.expires_at.type),
+        ),
+    )
+    .add_cte(_revoked_token, nest_here=True)
+    .returning(RefreshToken.id)
+)
+
+
+async def rotate_refresh_token(db: AsyncSession, token_data: TokenData) -> Optional[str]:
+    """Revoke a verified refresh token and issue its replacement.
+    
+    Returns None if the token is unknown, already revoked, or its user has
+    been deleted (their tokens go with them via ON DELETE CASCADE).
+    """
+    jti = token_data.jti
+    if jti is None:
+        return None
+    with _refresh_cache_lock:
+        if jti in _revoked_refresh_cache:
+            return None
+    
+    token, new_jti, expire = _encode_refresh_token(token_data.user_id)
+    result = await db.execute(_ROTATE_REFRESH_TOKEN, {
+        "old_jti": jti,
+        "user_id": token_data.user_id,
+        "new_jti": new_jti,
+        "token_hash": _token_key(token),
+        "expires_at": datetime.utcfromtimestamp(expire),
+    })
+    rotated = result.first() is not None
+    await db.commit()
+    
+    _mark_refresh_revoked(jti)
+    return token if rotated else None
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> bool:
     """Revoke a refresh token."""
-    db_token = db.query(RefreshToken).filter(RefreshToken.token == token).first()
-    if db_token:
-        db_token.is_revoked = True
-        db.commit()
-        return True
-    return False
+    jti = _refresh_token_jti(token)
+    if jti is None:
+        return False
+    result = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == jti, RefreshToken.is_revoked == False)
+        .values(is_revoked=True)
+    )
+    await db.commit()
+    _mark_refresh_revoked(jti)
+    return result.rowcount > 0
+
+
+async def purge_refresh_tokens(db: AsyncSession) -> int:
+    """Delete revoked and long-expired refresh tokens, returning how many."""
+    cutoff = datetime.utcnow() - REFRESH_TOKEN_RETENTION
+    result = await db.execute(
+        delete(RefreshToken).where(
+            or_(RefreshToken.is_revoked == True, RefreshToken.expires_at < cutoff)
+        )
+    )
+    await db.commit()
+    return result.rowcount
@@ -10,6 +10,12 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str
+    # Async pool, sized to the concurrency one worker is expected to serve
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    # Set when DATABASE_URL points at PgBouncer in transaction mode: PgBouncer
+    # does the pooling, and server-side prepared statements can't be reused
+    db_pgbouncer: bool = False
     
     # JWT
     secret_key: str
@@ -29,6 +35,13 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         case_sensitive = False
+        frozen = True
 
 
 settings = Settings()
+
+# Hot-path JWT settings as plain module constants, read once at import
+SECRET_KEY = settings.secret_key
+ALGORITHM = settings.algorithm
+ACCESS_TTL_S = settings.access_token_expire_minutes * 60
+REFRESH_TTL_S = settings.refresh_token_expire_days * 86400
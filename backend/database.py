@@ -1,6 +1,9 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from config import settings
 
 # Create SQLAlchemy engine
@@ -14,8 +17,65 @@ engine = create_engine(
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url():
+    """Return the database URL for asyncpg, plus its connect args.
+    
+    asyncpg doesn't understand libpq's sslmode query parameter, so it is
+    passed through as the ssl connect argument instead.
+    """
+    url = make_url(settings.database_url).set(drivername="postgresql+asyncpg")
+    connect_args = {}
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"])
+        connect_args["ssl"] = sslmode
+    if settings.db_pgbouncer:
+        # Transaction-mode PgBouncer may hand each statement a different
+        # server connection, so nothing prepared on one can be reused
+        url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+        connect_args["statement_cache_size"] = 0
+    else:
+        url = url.update_query_dict({"prepared_statement_cache_size": "500"})
+    return url, connect_args
+
+
+def _async_pool_args():
+    """Pool settings for the async engine; PgBouncer pools for us when present."""
+    if settings.db_pgbouncer:
+        return {"poolclass": NullPool}
+    return {
+        "pool_pre_ping": True,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": 1800,
+        "pool_timeout": 30,
+    }
+
+
+# Async engine for hot-path lookups; asyncpg prepares and caches statements
+_async_url, _async_connect_args = _async_database_url()
+async_engine = create_async_engine(
+    _async_url,
+    connect_args=_async_connect_args,
+    # Room for every distinct statement shape the routers build, so none is recompiled
+    query_cache_size=1200,
+    **_async_pool_args()
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+class _ModelBase:
+    # Timestamps come from server defaults; fetch them with RETURNING on
+    # INSERT and UPDATE rather than expiring them, which under AsyncSession
+    # would turn a later attribute read into an illegal lazy load
+    __mapper_args__ = {"eager_defaults": True}
+
+
 # Create Base class for models
-Base = declarative_base()
+Base = declarative_base(cls=_ModelBase)
 
 
 # Dependency to get database session
@@ -25,3 +85,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
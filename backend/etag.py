@@ -0,0 +1,36 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Clients must revalidate every time; the ETag makes that a cheap 304
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts) -> str:
+    """Build a weak ETag from the values a representation depends on."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the request's If-None-Match matches ``etag``.
+    
+    Comparison is weak, as If-None-Match requires.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL},
+        )
+    return None
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Attach ``etag`` and the revalidation policy to an outgoing response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
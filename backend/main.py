@@ -1,50 +1,117 @@
+import asyncio
+import logging
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from config import settings
-from database import engine, Base
+from database import engine, Base, AsyncSessionLocal
+from oauth import close_oauth_client
+from auth import purge_refresh_tokens, shutdown_password_executor
+from pagination import NEXT_CURSOR_HEADER
 from routers import auth, users, players, teams, admin, chat
 
-# Create database tables (wrapped so a DB hiccup doesn't crash startup)
-try:
-    Base.metadata.create_all(bind=engine)
-except Exception as e:
-    print(f"Warning: could not create tables on startup: {e}")
+logger = logging.getLogger("validation")
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     description="MyCricMate API - Cricket ecosystem platform",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes dicts, UUIDs and datetimes in C, faster than stdlib json
+    default_response_class=ORJSONResponse,
 )
 
+
+@app.on_event("startup")
+def create_tables():
+    """Create database tables once the server starts, not on import.
+    
+    Wrapped so a DB hiccup doesn't crash startup. Set SKIP_CREATE_ALL where
+    the schema is managed by migrations.
+    """
+    if os.environ.get("SKIP_CREATE_ALL"):
+        return
+    try:
+        Base.metadata.create_all(bind=engine)
+    except Exception as e:
+        print(f"Warning: could not create tables on startup: {e}")
+
+
+# Seconds between sweeps of revoked and long-expired refresh tokens
+REFRESH_TOKEN_PURGE_INTERVAL = 3600
+
+
+async def _purge_refresh_tokens_periodically():
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await purge_refresh_tokens(db)
+        except Exception as e:
+            print(f"Warning: could not purge refresh tokens: {e}")
+        await asyncio.sleep(REFRESH_TOKEN_PURGE_INTERVAL)
+
+
+@app.on_event("startup")
+async def start_refresh_token_purge():
+    """Keep the refresh_tokens table (and its indexes) small in the background."""
+    app.state.refresh_token_purge = asyncio.create_task(_purge_refresh_tokens_periodically())
+
+
+@app.on_event("shutdown")
+async def stop_refresh_token_purge():
+    """Cancel the background refresh-token sweep."""
+    app.state.refresh_token_purge.cancel()
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """Close shared outbound HTTP clients."""
+    await close_oauth_client()
+
+
+@app.on_event("shutdown")
+def close_password_executor():
+    """Stop the password-hashing thread pool."""
+    shutdown_password_executor()
+
+
 # Add custom exception handler for validation errors
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc):
-    print(f"========== VALIDATION ERROR ==========")
-    print(f"Request URL: {request.url}")
-    print(f"Request method: {request.method}")
-    print(f"Validation errors: {exc.errors()}")
-    print(f"Request body: {await request.body()}")
-    print(f"======================================")
-    return JSONResponse(
+    # Only read the request body when debug logging is actually on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Validation error on %s %s: %s; body: %r",
+            request.method, request.url, exc.errors(), await request.body(),
+        )
+    # errors() can carry the raised exception itself (ctx["error"] for a
+    # field_validator's ValueError), which orjson can't serialize
+    return ORJSONResponse(
         status_code=422,
-        content={"detail": exc.errors()},
+        content={"detail": jsonable_encoder(exc.errors())},
     )
 
+# Compress JSON bodies worth compressing (list pages, profiles); tiny
+# responses go out as-is. Added before CORS so CORS stays outermost.
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
 # Configure CORS — include all known origins; FRONTEND_URL covers the deployed Render URL
-_cors_origins = list({
+ORIGINS = tuple(dict.fromkeys((
     settings.frontend_url,
     "http://localhost:8080",
     "http://localhost:5173",
-})
+)))
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=_cors_origins,
+    allow_origins=ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -0,0 +1,38 @@
+"""
+Add GIN indexes on preferred_formats array columns for containment/overlap filters
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+GIN_INDEXES = [
+    ("ix_users_preferred_formats_gin", "users"),
+    ("ix_teams_preferred_formats_gin", "teams"),
+    ("ix_player_requirements_preferred_formats_gin", "player_requirements"),
+]
+
+def migrate():
+    """Run database migrations for array column indexes"""
+    engine = create_engine(settings.database_url)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            print("Creating GIN indexes...")
+            for index_name, table in GIN_INDEXES:
+                conn.execute(text(f"""
+                    CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name}
+                    ON {table} USING gin (preferred_formats);
+                """))
+                print(f"✓ Created {index_name}")
+
+            print("\n✅ Array index migrations completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Array Index Migrations")
+    print("=" * 60)
+    migrate()
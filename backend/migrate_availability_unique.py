@@ -0,0 +1,62 @@
+"""
+Enforce one player_availability row per player and date
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for the player availability constraint"""
+    engine = create_engine(settings.database_url)
+
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
+        try:
+            # Databases built by the original migrations already have an
+            # equivalent constraint under another name; don't add a duplicate
+            existing = conn.execute(text("""
+                SELECT c.conname FROM pg_constraint c
+                WHERE c.conrelid = 'player_availability'::regclass
+                  AND c.contype IN ('u', 'p')
+                  AND (
+                      SELECT array_agg(a.attname::text ORDER BY a.attname)
+                      FROM pg_attribute a
+                      WHERE a.attrelid = c.conrelid AND a.attnum = ANY(c.conkey)
+                  ) = ARRAY['date', 'player_id'];
+            """)).scalar()
+            if existing:
+                print(f"✓ (player_id, date) is already unique via {existing}; nothing to do")
+                return
+
+            # Keep the most recently updated entry for each player and date
+            print("Removing duplicate availability entries...")
+            conn.execute(text("""
+                DELETE FROM player_availability pa
+                USING (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY player_id, date
+                        ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, id
+                    ) AS rn
+                    FROM player_availability
+                ) ranked
+                WHERE pa.id = ranked.id AND ranked.rn > 1;
+            """))
+            print("✓ Removed duplicate availability entries")
+
+            print("Adding unique_player_date constraint...")
+            conn.execute(text("""
+                ALTER TABLE player_availability
+                ADD CONSTRAINT unique_player_date UNIQUE (player_id, date);
+            """))
+            print("✓ Added unique_player_date constraint")
+
+            print("\n✅ Player availability migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Player Availability Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,68 @@
+"""
+Recreate foreign keys with ON DELETE CASCADE / SET NULL so deleting a user or team
+is a single DELETE and dependent rows are removed by the database
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+# (table, column, referenced table, ON DELETE action)
+FOREIGN_KEYS = [
+    ("refresh_tokens", "user_id", "users", "CASCADE"),
+    ("teams", "captain_id", "users", "CASCADE"),
+    ("tournaments", "organizer_id", "users", "CASCADE"),
+    ("team_applications", "team_id", "teams", "CASCADE"),
+    ("team_applications", "player_id", "users", "CASCADE"),
+    ("team_invitations", "team_id", "teams", "CASCADE"),
+    ("team_invitations", "player_id", "users", "CASCADE"),
+    ("team_invitations", "invited_by", "users", "CASCADE"),
+    ("player_tournaments", "player_id", "users", "CASCADE"),
+    ("player_tournaments", "tournament_id", "tournaments", "CASCADE"),
+    ("player_tournaments", "team_id", "teams", "SET NULL"),
+    ("player_availability", "player_id", "users", "CASCADE"),
+    ("player_requirements", "team_id", "teams", "CASCADE"),
+    ("team_tournament_participations", "team_id", "teams", "CASCADE"),
+    ("team_tournament_participations", "tournament_id", "tournaments", "CASCADE"),
+    ("conversations", "user_a_id", "users", "CASCADE"),
+    ("conversations", "user_b_id", "users", "CASCADE"),
+    ("messages", "conversation_id", "conversations", "CASCADE"),
+    ("messages", "sender_id", "users", "CASCADE"),
+]
+
+def migrate():
+    """Run database migrations for cascading deletes"""
+    engine = create_engine(settings.database_url)
+
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
+        try:
+            # refresh_tokens.user_id had no foreign key; clear orphans first
+            print("Removing refresh tokens of deleted users...")
+            conn.execute(text("""
+                DELETE FROM refresh_tokens
+                WHERE user_id NOT IN (SELECT id FROM users);
+            """))
+            print("✓ Removed orphaned refresh tokens")
+
+            print("Recreating foreign keys...")
+            for table, column, referenced, action in FOREIGN_KEYS:
+                constraint = f"{table}_{column}_fkey"
+                conn.execute(text(f"""
+                    ALTER TABLE {table}
+                    DROP CONSTRAINT IF EXISTS {constraint},
+                    ADD CONSTRAINT {constraint}
+                        FOREIGN KEY ({column}) REFERENCES {referenced}(id)
+                        ON DELETE {action};
+                """))
+                print(f"✓ {table}.{column} -> {referenced} ON DELETE {action}")
+
+            print("\n✅ Cascade delete migrations completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Cascade Delete Migrations")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,66 @@
+"""
+Enforce one conversation per user pair with user_a_id < user_b_id
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for conversation constraints"""
+    engine = create_engine(settings.database_url)
+
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
+        try:
+            print("Normalizing participant order...")
+            conn.execute(text("""
+                UPDATE conversations
+                SET user_a_id = user_b_id, user_b_id = user_a_id
+                WHERE user_a_id > user_b_id;
+            """))
+            print("✓ Normalized participant order")
+
+            # Keep the oldest thread per pair and move messages from any duplicates into it
+            print("Merging duplicate conversations...")
+            conn.execute(text("""
+                CREATE TEMP TABLE conversation_merge ON COMMIT DROP AS
+                SELECT id, first_value(id) OVER (
+                    PARTITION BY user_a_id, user_b_id ORDER BY created_at, id
+                ) AS keep_id
+                FROM conversations;
+            """))
+            conn.execute(text("""
+                UPDATE messages m
+                SET conversation_id = cm.keep_id
+                FROM conversation_merge cm
+                WHERE m.conversation_id = cm.id AND cm.id <> cm.keep_id;
+            """))
+            conn.execute(text("""
+                DELETE FROM conversations c
+                USING conversation_merge cm
+                WHERE c.id = cm.id AND cm.id <> cm.keep_id;
+            """))
+            print("✓ Merged duplicate conversations")
+
+            print("Adding constraints...")
+            conn.execute(text("""
+                ALTER TABLE conversations
+                ADD CONSTRAINT uq_conv_users UNIQUE (user_a_id, user_b_id),
+                ADD CONSTRAINT ck_conv_user_order CHECK (user_a_id < user_b_id);
+            """))
+            # Covered by the leading column of uq_conv_users
+            conn.execute(text("""
+                DROP INDEX IF EXISTS ix_conversations_user_a_id;
+            """))
+            print("✓ Added constraints")
+
+            print("\n✅ Conversation constraint migrations completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Conversation Constraint Migrations")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,43 @@
+"""
+Add per-participant (user_id, updated_at DESC) indexes for the conversation inbox
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for conversation indexes"""
+    engine = create_engine(settings.database_url)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            print("Creating conversation inbox indexes...")
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conv_user_a_updated
+                ON conversations(user_a_id, updated_at DESC);
+            """))
+            print("✓ Created ix_conv_user_a_updated index")
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conv_user_b_updated
+                ON conversations(user_b_id, updated_at DESC);
+            """))
+            print("✓ Created ix_conv_user_b_updated index")
+
+            # Covered by the leading column of ix_conv_user_b_updated
+            print("Dropping ix_conversations_user_b_id index...")
+            conn.execute(text("""
+                DROP INDEX CONCURRENTLY IF EXISTS ix_conversations_user_b_id;
+            """))
+            print("✓ Dropped ix_conversations_user_b_id index")
+
+            print("\n✅ Conversation index migrations completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Conversation Index Migrations")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,51 @@
+"""
+Add per-participant unread counters to conversations
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for conversation unread counters"""
+    engine = create_engine(settings.database_url)
+
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
+        try:
+            print("Adding unread_for_a / unread_for_b columns to conversations...")
+            conn.execute(text("""
+                ALTER TABLE conversations
+                ADD COLUMN IF NOT EXISTS unread_for_a INTEGER NOT NULL DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS unread_for_b INTEGER NOT NULL DEFAULT 0;
+            """))
+            print("✓ Added unread counter columns")
+
+            # Seed the counters from the messages that are currently unread
+            print("Backfilling unread counters...")
+            conn.execute(text("""
+                UPDATE conversations c
+                SET unread_for_a = counts.for_a,
+                    unread_for_b = counts.for_b
+                FROM (
+                    SELECT m.conversation_id,
+                           count(*) FILTER (WHERE m.sender_id = c2.user_b_id) AS for_a,
+                           count(*) FILTER (WHERE m.sender_id = c2.user_a_id) AS for_b
+                    FROM messages m
+                    JOIN conversations c2 ON c2.id = m.conversation_id
+                    WHERE m.is_read = false
+                    GROUP BY m.conversation_id
+                ) counts
+                WHERE c.id = counts.conversation_id;
+            """))
+            print("✓ Backfilled unread counters")
+
+            print("\n✅ Conversation unread counter migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Conversation Unread Counter Migration")
+    print("=" * 60)
+    migrate()
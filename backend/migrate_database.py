@@ -8,7 +8,8 @@ def migrate():
     """Run database migrations"""
     engine = create_engine(settings.database_url)
     
-    with engine.connect() as conn:
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
         try:
             # Add is_available column to users table
             print("Adding is_available column to users table...")
@@ -16,7 +17,6 @@ def migrate():
                 ALTER TABLE users 
                 ADD COLUMN IF NOT EXISTS is_available BOOLEAN DEFAULT TRUE;
             """))
-            conn.commit()
             print("✓ Added is_available column")
             
             # Create teams table
@@ -38,7 +38,6 @@ def migrate():
                     updated_at TIMESTAMP DEFAULT NOW()
                 );
             """))
-            conn.commit()
             print("✓ Created teams table")
             
             # Create tournaments table
@@ -64,7 +63,6 @@ def migrate():
                     updated_at TIMESTAMP DEFAULT NOW()
                 );
             """))
-            conn.commit()
             print("✓ Created tournaments table")
             
             # Create team_applications table
@@ -81,7 +79,6 @@ def migrate():
                     CONSTRAINT unique_team_player_application UNIQUE (team_id, player_id)
                 );
             """))
-            conn.commit()
             print("✓ Created team_applications table")
             
             # Create team_invitations table
@@ -99,7 +96,6 @@ def migrate():
                     updated_at TIMESTAMP DEFAULT NOW()
                 );
             """))
-            conn.commit()
             print("✓ Created team_invitations table")
             
             # Create player_tournaments table
@@ -114,7 +110,6 @@ def migrate():
                     created_at TIMESTAMP DEFAULT NOW()
                 );
             """))
-            conn.commit()
             print("✓ Created player_tournaments table")
             
             # Create player_availability table
@@ -131,14 +126,12 @@ def migrate():
                     CONSTRAINT unique_player_date UNIQUE (player_id, date)
                 );
             """))
-            conn.commit()
             print("✓ Created player_availability table")
             
             print("\n✅ All migrations completed successfully!")
             
         except Exception as e:
             print(f"\n❌ Migration failed: {e}")
-            conn.rollback()
             raise
 
 if __name__ == "__main__":
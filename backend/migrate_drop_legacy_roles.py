@@ -0,0 +1,39 @@
+"""
+Shrink users.roles_mask to SMALLINT and drop the legacy users.roles enum array
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations to finish the roles bitmask switch"""
+    engine = create_engine(settings.database_url)
+
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
+        try:
+            print("Converting roles_mask to SMALLINT...")
+            conn.execute(text("""
+                ALTER TABLE users
+                ALTER COLUMN roles_mask TYPE SMALLINT;
+            """))
+            print("✓ Converted roles_mask")
+
+            # Run migrate_user_roles_mask.py first so the mask is backfilled
+            print("Dropping legacy roles column...")
+            conn.execute(text("""
+                ALTER TABLE users
+                DROP COLUMN IF EXISTS roles;
+            """))
+            print("✓ Dropped legacy roles column")
+
+            print("\n✅ Legacy roles migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Legacy Roles Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,41 @@
+"""
+Replace the team_invitations(player_id, status, expires_at) index with a partial
+index over pending invitations ordered by created_at
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for the pending invitation index"""
+    engine = create_engine(settings.database_url)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            print("Creating ix_team_invitations_pending_player_created index...")
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_team_invitations_pending_player_created
+                ON team_invitations(player_id, created_at DESC)
+                INCLUDE (expires_at)
+                WHERE status = 'PENDING';
+            """))
+            print("✓ Created ix_team_invitations_pending_player_created index")
+
+            # Superseded by the partial index above
+            print("Dropping ix_team_invitations_player_status_expires index...")
+            conn.execute(text("""
+                DROP INDEX CONCURRENTLY IF EXISTS ix_team_invitations_player_status_expires;
+            """))
+            print("✓ Dropped ix_team_invitations_player_status_expires index")
+
+            print("\n✅ Pending invitation index migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Pending Invitation Index Migration")
+    print("=" * 60)
+    migrate()
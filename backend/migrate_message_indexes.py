@@ -0,0 +1,47 @@
+"""
+Replace the messages(conversation_id) index with an ordered (conversation_id, created_at, id) index,
+and add a partial index over unread messages
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for message indexes"""
+    engine = create_engine(settings.database_url)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            print("Creating ix_messages_conv_created index...")
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_conv_created
+                ON messages(conversation_id, created_at, id);
+            """))
+            print("✓ Created ix_messages_conv_created index")
+
+            print("Creating ix_messages_unread index...")
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_unread
+                ON messages(conversation_id, sender_id)
+                WHERE is_read = false;
+            """))
+            print("✓ Created ix_messages_unread index")
+
+            # Covered by the leading column of the new index
+            print("Dropping ix_messages_conversation_id index...")
+            conn.execute(text("""
+                DROP INDEX CONCURRENTLY IF EXISTS ix_messages_conversation_id;
+            """))
+            print("✓ Dropped ix_messages_conversation_id index")
+
+            print("\n✅ Message index migrations completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Message Index Migrations")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,37 @@
+"""
+Add (created_at DESC, id DESC) indexes for keyset pagination of users and teams
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+PAGINATION_INDEXES = [
+    ("ix_users_created_at_desc", "users"),
+    ("ix_teams_created_at_desc", "teams"),
+]
+
+def migrate():
+    """Run database migrations for pagination indexes"""
+    engine = create_engine(settings.database_url)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            print("Creating pagination indexes...")
+            for index_name, table in PAGINATION_INDEXES:
+                conn.execute(text(f"""
+                    CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name}
+                    ON {table} (created_at DESC, id DESC);
+                """))
+                print(f"✓ Created {index_name}")
+
+            print("\n✅ Pagination index migrations completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Pagination Index Migrations")
+    print("=" * 60)
+    migrate()
@@ -4,6 +4,7 @@ This fixes any passwords that may have been hashed incorrectly.
 
 Run this script once to update existing user passwords.
 """
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from database import SessionLocal, engine
 from models import User
@@ -21,7 +22,7 @@ def migrate_passwords():
     db = SessionLocal()
     try:
         # Get all users with password authentication (not OAuth)
-        users = db.query(User).filter(User.hashed_password.isnot(None)).all()
+        users = db.scalars(select(User).where(User.hashed_password.isnot(None))).all()
         
         print(f"Found {len(users)} users with password authentication")
         print("\nNOTE: This script cannot rehash existing passwords automatically")
@@ -0,0 +1,83 @@
+"""
+Allow at most one pending application and one pending invitation per player and team
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for the pending application/invitation indexes"""
+    engine = create_engine(settings.database_url)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            # Keep the oldest pending row for each pair; later ones are withdrawn
+            print("Withdrawing duplicate pending applications...")
+            conn.execute(text("""
+                UPDATE team_applications ta
+                SET status = 'WITHDRAWN', updated_at = now()
+                FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY team_id, player_id
+                        ORDER BY created_at NULLS LAST, id
+                    ) AS rn
+                    FROM team_applications
+                    WHERE status = 'PENDING'
+                ) ranked
+                WHERE ta.id = ranked.id AND ranked.rn > 1;
+            """))
+            print("✓ Withdrew duplicate pending applications")
+
+            print("Creating uq_team_applications_pending index...")
+            conn.execute(text("""
+                CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_team_applications_pending
+                ON team_applications(team_id, player_id)
+                WHERE status = 'PENDING';
+            """))
+            print("✓ Created uq_team_applications_pending index")
+
+            # migrate_database.py made (team_id, player_id) unique across every
+            # status, which stops a player re-applying after a rejection; the
+            # partial index above is the intended rule, so the old one goes
+            print("Dropping unique_team_player_application constraint...")
+            conn.execute(text("""
+                ALTER TABLE team_applications
+                DROP CONSTRAINT IF EXISTS unique_team_player_application;
+            """))
+            print("✓ Dropped unique_team_player_application constraint")
+
+            print("Expiring duplicate pending invitations...")
+            conn.execute(text("""
+                UPDATE team_invitations ti
+                SET status = 'EXPIRED', updated_at = now()
+                FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY team_id, player_id
+                        ORDER BY created_at NULLS LAST, id
+                    ) AS rn
+                    FROM team_invitations
+                    WHERE status = 'PENDING'
+                ) ranked
+                WHERE ti.id = ranked.id AND ranked.rn > 1;
+            """))
+            print("✓ Expired duplicate pending invitations")
+
+            print("Creating uq_team_invitations_pending index...")
+            conn.execute(text("""
+                CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_team_invitations_pending
+                ON team_invitations(team_id, player_id)
+                WHERE status = 'PENDING';
+            """))
+            print("✓ Created uq_team_invitations_pending index")
+
+            print("\n✅ Pending application/invitation index migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Pending Application/Invitation Index Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,31 @@
+"""
+Index player_tournaments by player_id for the player profile lookup
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for the player_tournaments index"""
+    engine = create_engine(settings.database_url)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            print("Creating ix_player_tournaments_player_id index...")
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_player_tournaments_player_id
+                ON player_tournaments(player_id);
+            """))
+            print("✓ Created ix_player_tournaments_player_id index")
+
+            print("\n✅ Player tournament index migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Player Tournament Index Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,32 @@
+"""
+Add a partial index for looking up a user's active refresh tokens
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for the refresh token index"""
+    engine = create_engine(settings.database_url)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            print("Creating ix_refresh_user_active index...")
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_refresh_user_active
+                ON refresh_tokens(user_id, is_revoked, expires_at)
+                WHERE is_revoked = false;
+            """))
+            print("✓ Created ix_refresh_user_active index")
+
+            print("\n✅ Refresh token index migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Refresh Token Index Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,47 @@
+"""
+Store refresh tokens by jti + SHA-256 hash instead of the full JWT string
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for hashed refresh tokens"""
+    engine = create_engine(settings.database_url)
+
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
+        try:
+            # Tokens issued before this change carry no jti claim and can no
+            # longer be looked up, so drop them; affected users sign in again.
+            print("Removing legacy refresh tokens...")
+            conn.execute(text("""
+                DELETE FROM refresh_tokens;
+            """))
+            print("✓ Removed legacy refresh tokens")
+
+            print("Replacing token column with token_hash...")
+            conn.execute(text("""
+                ALTER TABLE refresh_tokens
+                DROP COLUMN IF EXISTS token,
+                ADD COLUMN IF NOT EXISTS token_hash BYTEA NOT NULL;
+            """))
+            print("✓ Replaced token column with token_hash")
+
+            print("Creating indexes...")
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_refresh_tokens_token_hash
+                ON refresh_tokens(token_hash);
+            """))
+            print("✓ Created indexes")
+
+            print("\n✅ Refresh token migrations completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Refresh Token Migrations")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,38 @@
+"""
+Add indexes for the swipe/apply/invite lookups on team applications and invitations
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for swipe/apply/invite indexes"""
+    engine = create_engine(settings.database_url)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            print("Creating ix_team_applications_team_player_status index...")
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_team_applications_team_player_status
+                ON team_applications(team_id, player_id, status);
+            """))
+            print("✓ Created ix_team_applications_team_player_status index")
+
+            print("Creating ix_team_invitations_player_status_expires index...")
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_team_invitations_player_status_expires
+                ON team_invitations(player_id, status, expires_at);
+            """))
+            print("✓ Created ix_team_invitations_player_status_expires index")
+
+            print("\n✅ Swipe index migrations completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Swipe Index Migrations")
+    print("=" * 60)
+    migrate()
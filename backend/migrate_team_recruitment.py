@@ -8,7 +8,8 @@ def migrate():
     """Run database migrations for team recruitment features"""
     engine = create_engine(settings.database_url)
     
-    with engine.connect() as conn:
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
         try:
             # Add new columns to teams table
             print("Adding current_player_count and is_squad_full to teams table...")
@@ -17,7 +18,6 @@ def migrate():
                 ADD COLUMN IF NOT EXISTS current_player_count INTEGER DEFAULT 0,
                 ADD COLUMN IF NOT EXISTS is_squad_full BOOLEAN DEFAULT FALSE;
             """))
-            conn.commit()
             print("✓ Added squad management columns to teams table")
             
             # Create player_requirements table
@@ -42,7 +42,6 @@ def migrate():
                     updated_at TIMESTAMP DEFAULT NOW()
                 );
             """))
-            conn.commit()
             print("✓ Created player_requirements table")
             
             # Create team_tournament_participations table
@@ -60,7 +59,6 @@ def migrate():
                     CONSTRAINT unique_team_tournament UNIQUE (team_id, tournament_id)
                 );
             """))
-            conn.commit()
             print("✓ Created team_tournament_participations table")
             
             # Create indexes for better query performance
@@ -90,7 +88,6 @@ def migrate():
                 ON team_tournament_participations(tournament_id);
             """))
             
-            conn.commit()
             print("✓ Created indexes")
             
             print("\n✅ Team recruitment migrations completed successfully!")
@@ -102,7 +99,6 @@ def migrate():
             
         except Exception as e:
             print(f"\n❌ Migration failed: {e}")
-            conn.rollback()
             raise
 
 if __name__ == "__main__":
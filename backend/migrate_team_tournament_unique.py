@@ -0,0 +1,62 @@
+"""
+Enforce one team_tournament_participations row per team and tournament
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for the team tournament registration constraint"""
+    engine = create_engine(settings.database_url)
+
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
+        try:
+            # Databases built by the original migrations already have an
+            # equivalent constraint under another name; don't add a duplicate
+            existing = conn.execute(text("""
+                SELECT c.conname FROM pg_constraint c
+                WHERE c.conrelid = 'team_tournament_participations'::regclass
+                  AND c.contype IN ('u', 'p')
+                  AND (
+                      SELECT array_agg(a.attname::text ORDER BY a.attname)
+                      FROM pg_attribute a
+                      WHERE a.attrelid = c.conrelid AND a.attnum = ANY(c.conkey)
+                  ) = ARRAY['team_id', 'tournament_id'];
+            """)).scalar()
+            if existing:
+                print(f"✓ (team_id, tournament_id) is already unique via {existing}; nothing to do")
+                return
+
+            # Keep the earliest registration for each team and tournament
+            print("Removing duplicate tournament registrations...")
+            conn.execute(text("""
+                DELETE FROM team_tournament_participations ttp
+                USING (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY team_id, tournament_id
+                        ORDER BY is_confirmed DESC, registration_date NULLS LAST, id
+                    ) AS rn
+                    FROM team_tournament_participations
+                ) ranked
+                WHERE ttp.id = ranked.id AND ranked.rn > 1;
+            """))
+            print("✓ Removed duplicate tournament registrations")
+
+            print("Adding unique_team_tournament constraint...")
+            conn.execute(text("""
+                ALTER TABLE team_tournament_participations
+                ADD CONSTRAINT unique_team_tournament UNIQUE (team_id, tournament_id);
+            """))
+            print("✓ Added unique_team_tournament constraint")
+
+            print("\n✅ Team tournament registration migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Team Tournament Registration Migration")
+    print("=" * 60)
+    migrate()
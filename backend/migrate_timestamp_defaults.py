@@ -0,0 +1,53 @@
+"""
+Give created_at/updated_at (and registration_date) database-side defaults
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+# Columns the models now default on the database clock
+TIMESTAMP_COLUMNS = {
+    "users": ("created_at", "updated_at"),
+    "refresh_tokens": ("created_at",),
+    "teams": ("created_at", "updated_at"),
+    "tournaments": ("created_at", "updated_at"),
+    "team_applications": ("created_at", "updated_at"),
+    "team_invitations": ("created_at", "updated_at"),
+    "player_tournaments": ("created_at",),
+    "player_availability": ("created_at", "updated_at"),
+    "player_requirements": ("created_at", "updated_at"),
+    "team_tournament_participations": ("registration_date", "created_at", "updated_at"),
+    "conversations": ("created_at", "updated_at"),
+    "messages": ("created_at",),
+}
+
+def migrate():
+    """Run database migrations for timestamp defaults"""
+    engine = create_engine(settings.database_url)
+
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
+        try:
+            for table, columns in TIMESTAMP_COLUMNS.items():
+                print(f"Setting timestamp defaults on {table}...")
+                # SET DEFAULT only touches the catalog; existing rows are not rewritten
+                conn.execute(text(
+                    f"ALTER TABLE {table} "
+                    + ", ".join(
+                        f"ALTER COLUMN {column} SET DEFAULT timezone('utc', now())"
+                        for column in columns
+                    )
+                    + ";"
+                ))
+                print(f"✓ Set timestamp defaults on {table}")
+
+            print("\n✅ Timestamp default migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Timestamp Default Migration")
+    print("=" * 60)
+    migrate()
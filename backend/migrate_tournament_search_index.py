@@ -0,0 +1,39 @@
+"""
+Add an (is_published, start_date, id) index for tournament search
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for the tournament search index"""
+    engine = create_engine(settings.database_url)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            # Covers ORDER BY start_date, id so results come back pre-sorted
+            print("Creating ix_tournaments_published_start_id index...")
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tournaments_published_start_id
+                ON tournaments(is_published, start_date, id);
+            """))
+            print("✓ Created ix_tournaments_published_start_id index")
+
+            # Superseded by the index above
+            print("Dropping ix_tournaments_published_start index...")
+            conn.execute(text("""
+                DROP INDEX CONCURRENTLY IF EXISTS ix_tournaments_published_start;
+            """))
+            print("✓ Dropped ix_tournaments_published_start index")
+
+            print("\n✅ Tournament search index migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Tournament Search Index Migration")
+    print("=" * 60)
+    migrate()
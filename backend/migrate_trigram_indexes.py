@@ -0,0 +1,44 @@
+"""
+Add pg_trgm GIN indexes for ILIKE substring search on users, teams and tournaments
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+TRIGRAM_INDEXES = [
+    ("ix_users_email_trgm", "users", "email"),
+    ("ix_users_full_name_trgm", "users", "full_name"),
+    ("ix_teams_name_trgm", "teams", "name"),
+    ("ix_teams_city_trgm", "teams", "city"),
+    ("ix_tournaments_city_trgm", "tournaments", "city"),
+]
+
+def migrate():
+    """Run database migrations for trigram search indexes"""
+    engine = create_engine(settings.database_url)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            print("Enabling pg_trgm extension...")
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
+            print("✓ Enabled pg_trgm")
+
+            print("Creating trigram indexes...")
+            for index_name, table, column in TRIGRAM_INDEXES:
+                conn.execute(text(f"""
+                    CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name}
+                    ON {table} USING gin ({column} gin_trgm_ops);
+                """))
+                print(f"✓ Created {index_name}")
+
+            print("\n✅ Trigram index migrations completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Trigram Index Migrations")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,46 @@
+"""
+Store user latitude/longitude as numeric columns instead of strings
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for numeric user coordinates"""
+    engine = create_engine(settings.database_url)
+
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
+        try:
+            # Values that don't parse as numbers are cleared rather than failing the cast
+            print("Converting latitude/longitude to DOUBLE PRECISION...")
+            conn.execute(text(r"""
+                ALTER TABLE users
+                ALTER COLUMN latitude TYPE DOUBLE PRECISION USING (
+                    CASE WHEN latitude ~ '^\s*[-+]?[0-9]+(\.[0-9]+)?\s*$'
+                         THEN latitude::double precision END
+                ),
+                ALTER COLUMN longitude TYPE DOUBLE PRECISION USING (
+                    CASE WHEN longitude ~ '^\s*[-+]?[0-9]+(\.[0-9]+)?\s*$'
+                         THEN longitude::double precision END
+                );
+            """))
+            print("✓ Converted latitude/longitude")
+
+            print("Creating indexes...")
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_users_lat_lng
+                ON users(latitude, longitude);
+            """))
+            print("✓ Created indexes")
+
+            print("\n✅ User coordinate migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running User Coordinate Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,52 @@
+"""
+Store user roles as an integer bitmask (roles_mask) instead of an enum array
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for the roles bitmask"""
+    engine = create_engine(settings.database_url)
+
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
+        try:
+            print("Adding roles_mask column to users table...")
+            conn.execute(text("""
+                ALTER TABLE users
+                ADD COLUMN IF NOT EXISTS roles_mask INTEGER NOT NULL DEFAULT 0;
+            """))
+            print("✓ Added roles_mask column")
+
+            # The legacy array holds enum names (PLAYER, CAPTAIN, ...); bits
+            # match ROLE_PLAYER/ROLE_CAPTAIN/ROLE_ORGANIZER/ROLE_STAFF in models.py
+            print("Backfilling roles_mask from roles...")
+            conn.execute(text("""
+                UPDATE users SET roles_mask =
+                    (CASE WHEN 'PLAYER' = ANY(roles::text[]) THEN 1 ELSE 0 END)
+                  | (CASE WHEN 'CAPTAIN' = ANY(roles::text[]) THEN 2 ELSE 0 END)
+                  | (CASE WHEN 'ORGANIZER' = ANY(roles::text[]) THEN 4 ELSE 0 END)
+                  | (CASE WHEN 'STAFF' = ANY(roles::text[]) THEN 8 ELSE 0 END)
+                WHERE roles IS NOT NULL;
+            """))
+            print("✓ Backfilled roles_mask")
+
+            print("Creating indexes...")
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_users_roles_mask
+                ON users(roles_mask);
+            """))
+            print("✓ Created indexes")
+
+            print("\n✅ Roles bitmask migration completed successfully!")
+            print("\nThe legacy users.roles column is no longer read; drop it with migrate_drop_legacy_roles.py.")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Roles Bitmask Migration")
+    print("=" * 60)
+    migrate()
@@ -0,0 +1,39 @@
+"""
+Store users.weekly_availability as JSONB with a jsonb_path_ops GIN index
+"""
+from sqlalchemy import create_engine, text
+from config import settings
+
+def migrate():
+    """Run database migrations for weekly availability"""
+    engine = create_engine(settings.database_url)
+
+    # One transaction for the whole migration; rolled back on any failure
+    with engine.begin() as conn:
+        try:
+            print("Converting weekly_availability to JSONB...")
+            conn.execute(text("""
+                ALTER TABLE users
+                ALTER COLUMN weekly_availability TYPE JSONB
+                USING weekly_availability::jsonb;
+            """))
+            print("✓ Converted weekly_availability")
+
+            print("Creating indexes...")
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_users_weekly_avail_gin
+                ON users USING gin (weekly_availability jsonb_path_ops);
+            """))
+            print("✓ Created indexes")
+
+            print("\n✅ Weekly availability migration completed successfully!")
+
+        except Exception as e:
+            print(f"\n❌ Migration failed: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Running Weekly Availability Migration")
+    print("=" * 60)
+    migrate()
@@ -1,11 +1,17 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Enum as SQLEnum, ARRAY, ForeignKey, Text, Date, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, SmallInteger, Float, Enum as SQLEnum, ARRAY, ForeignKey, Text, Date, LargeBinary, Index, UniqueConstraint, CheckConstraint, DDL, event, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.hybrid import hybrid_method, hybrid_property
 from sqlalchemy.orm import relationship
-from datetime import datetime
 import uuid
 import enum
 from database import Base
 
+# Trigram indexes below need pg_trgm; make sure create_all can build them
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+# The database clock as naive UTC, comparable with the naive-UTC DateTime columns
+DB_UTCNOW = func.timezone("utc", func.now())
+
 
 class UserRole(str, enum.Enum):
     PLAYER = "player"
@@ -14,6 +20,33 @@ class UserRole(str, enum.Enum):
     STAFF = "staff"
 
 
+# Bit assigned to each role in User.roles_mask
+ROLE_PLAYER = 1
+ROLE_CAPTAIN = 2
+ROLE_ORGANIZER = 4
+ROLE_STAFF = 8
+
+ROLE_BITS = {
+    UserRole.PLAYER: ROLE_PLAYER,
+    UserRole.CAPTAIN: ROLE_CAPTAIN,
+    UserRole.ORGANIZER: ROLE_ORGANIZER,
+    UserRole.STAFF: ROLE_STAFF,
+}
+
+
+def roles_to_mask(roles) -> int:
+    """Encode a list of roles (UserRole or role values) as a bitmask."""
+    mask = 0
+    for role in roles or []:
+        mask |= ROLE_BITS[UserRole(role)]
+    return mask
+
+
+def mask_to_roles(mask: int) -> list:
+    """Decode a roles bitmask into a list of UserRole."""
+    return [role for role, bit in ROLE_BITS.items() if (mask or 0) & bit]
+
+
 class AuthProvider(str, enum.Enum):
     EMAIL = "email"
     GOOGLE = "google"
@@ -60,11 +93,11 @@ class User(Base):
     phone = Column(String, nullable=True)
     city = Column(String, nullable=True)
     discovery_radius = Column(Integer, default=25)  # in miles
-    latitude = Column(String, nullable=True)  # For precise location
-    longitude = Column(String, nullable=True)  # For precise location
+    latitude = Column(Float, nullable=True)  # For precise location
+    longitude = Column(Float, nullable=True)  # For precise location
     
-    # User roles - can have multiple
-    roles = Column(ARRAY(SQLEnum(UserRole)), default=[])
+    # User roles - can have multiple; one ROLE_* bit per role
+    roles_mask = Column(SmallInteger, nullable=False, default=0, index=True)
     
     # Player specific
     batting_style = Column(String, nullable=True)
@@ -74,7 +107,7 @@ class User(Base):
     preferred_formats = Column(ARRAY(String), default=[])
     is_available = Column(Boolean, default=True)  # Player availability toggle
     # Weekly schedule: { "monday": ["morning","afternoon"], "tuesday": ["evening"], ... }
-    weekly_availability = Column(JSON, nullable=True, default=None)
+    weekly_availability = Column(JSONB, nullable=True, default=None)
     
     # Authentication
     auth_provider = Column(SQLEnum(AuthProvider), default=AuthProvider.EMAIL)
@@ -85,10 +118,49 @@ class User(Base):
     profile_visible = Column(Boolean, default=True)  # Control visibility in feeds
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
+    updated_at = Column(DateTime, server_default=DB_UTCNOW, onupdate=DB_UTCNOW)
     last_login = Column(DateTime, nullable=True)
     
+    __table_args__ = (
+        # Bounding-box lookups for nearby-player discovery
+        Index("ix_users_lat_lng", "latitude", "longitude"),
+        # Keyset pagination: newest first, id breaks ties
+        Index("ix_users_created_at_desc", created_at.desc(), id.desc()),
+        # Substring search (ILIKE '%term%') in the admin user list
+        Index("ix_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_users_full_name_trgm", "full_name", postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"}),
+        # Containment/overlap filters on formats (@>, &&)
+        Index("ix_users_preferred_formats_gin", "preferred_formats", postgresql_using="gin"),
+        # Availability filters must use @> containment; -> traversal can't use this index
+        Index(
+            "ix_users_weekly_avail_gin", "weekly_availability",
+            postgresql_using="gin",
+            postgresql_ops={"weekly_availability": "jsonb_path_ops"},
+        ),
+    )
+    
+    @hybrid_property
+    def roles(self) -> list:
+        return mask_to_roles(self.roles_mask)
+    
+    @roles.setter
+    def roles(self, roles) -> None:
+        self.roles_mask = roles_to_mask(roles)
+    
+    @roles.expression
+    def roles(cls):
+        return cls.roles_mask
+    
+    @hybrid_method
+    def has_role(self, bit: int) -> bool:
+        """Test a ROLE_* bit, in Python or as a SQL filter."""
+        return bool((self.roles_mask or 0) & bit)
+    
+    @has_role.expression
+    def has_role(cls, bit: int):
+        return cls.roles_mask.op("&")(bit) != 0
+    
     def __repr__(self):
         return f"<User {self.email}>"
 
@@ -96,15 +168,23 @@ class User(Base):
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
-    token = Column(String, unique=True, nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # The token's jti claim
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    token_hash = Column(LargeBinary(32), nullable=False, index=True)  # SHA-256 of the token
     expires_at = Column(DateTime, nullable=False)
     is_revoked = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
+    
+    __table_args__ = (
+        # Active tokens per user; nearly all rows are unrevoked, so keep it partial
+        Index(
+            "ix_refresh_user_active", "user_id", "is_revoked", "expires_at",
+            postgresql_where=(is_revoked == False),
+        ),
+    )
     
     def __repr__(self):
-        return f"<RefreshToken {self.token[:10]}...>"
+        return f"<RefreshToken {self.id}>"
 
 
 class Team(Base):
@@ -113,7 +193,7 @@ class Team(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    captain_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
+    captain_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     city = Column(String, nullable=True)
     home_ground = Column(String, nullable=True)
     established_date = Column(Date, nullable=True)
@@ -124,8 +204,27 @@ class Team(Base):
     current_player_count = Column(Integer, default=0)
     is_squad_full = Column(Boolean, default=False)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
+    updated_at = Column(DateTime, server_default=DB_UTCNOW, onupdate=DB_UTCNOW)
+    
+    __table_args__ = (
+        # Containment/overlap filters on formats (@>, &&)
+        Index("ix_teams_preferred_formats_gin", "preferred_formats", postgresql_using="gin"),
+        # Keyset pagination: newest first, id breaks ties
+        Index("ix_teams_created_at_desc", created_at.desc(), id.desc()),
+        # Substring search (ILIKE '%term%') on team names and cities
+        Index("ix_teams_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_teams_city_trgm", "city", postgresql_using="gin", postgresql_ops={"city": "gin_trgm_ops"}),
+    )
+    
+    # Must be loaded explicitly (join/selectinload) to avoid per-row lookups
+    captain = relationship("User", foreign_keys=[captain_id], lazy="raise")
+    # Loaded with selectinload for the team profile; rows go with the team
+    # via ON DELETE CASCADE, so deletes don't need to load them
+    player_requirements = relationship("PlayerRequirement", lazy="raise", passive_deletes=True)
+    tournament_participations = relationship(
+        "TeamTournamentParticipation", lazy="raise", passive_deletes=True
+    )
     
     def __repr__(self):
         return f"<Team {self.name}>"
@@ -137,7 +236,7 @@ class Tournament(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    organizer_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
+    organizer_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     format = Column(String, nullable=False)  # T20, T10, ODI, etc.
     city = Column(String, nullable=True)
     venue = Column(String, nullable=True)
@@ -150,8 +249,15 @@ class Tournament(Base):
     logo_url = Column(String, nullable=True)
     is_published = Column(Boolean, default=False)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
+    updated_at = Column(DateTime, server_default=DB_UTCNOW, onupdate=DB_UTCNOW)
+    
+    __table_args__ = (
+        # Tournament search: published only, soonest first (id breaks ties)
+        Index("ix_tournaments_published_start_id", "is_published", "start_date", "id"),
+        # Substring search (ILIKE '%city%')
+        Index("ix_tournaments_city_trgm", "city", postgresql_using="gin", postgresql_ops={"city": "gin_trgm_ops"}),
+    )
     
     def __repr__(self):
         return f"<Tournament {self.name}>"
@@ -161,13 +267,26 @@ class TeamApplication(Base):
     __tablename__ = "team_applications"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id'), nullable=False)
-    player_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
+    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id', ondelete='CASCADE'), nullable=False)
+    player_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     status = Column(SQLEnum(ApplicationStatus), default=ApplicationStatus.PENDING)
     message = Column(Text, nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
+    updated_at = Column(DateTime, server_default=DB_UTCNOW, onupdate=DB_UTCNOW)
+    
+    __table_args__ = (
+        # At most one pending application per player and team (re-applying
+        # after a rejection is allowed); lets swipes and apply_to_team insert
+        # with ON CONFLICT DO NOTHING instead of checking first
+        Index(
+            "uq_team_applications_pending", "team_id", "player_id",
+            unique=True,
+            postgresql_where=(status == ApplicationStatus.PENDING),
+        ),
+        # Any-status lookups for a player and team (swipe idempotency)
+        Index("ix_team_applications_team_player_status", "team_id", "player_id", "status"),
+    )
     
     def __repr__(self):
         return f"<TeamApplication player={self.player_id} team={self.team_id}>"
@@ -177,15 +296,31 @@ class TeamInvitation(Base):
     __tablename__ = "team_invitations"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id'), nullable=False)
-    player_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
-    invited_by = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
+    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id', ondelete='CASCADE'), nullable=False)
+    player_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    invited_by = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     status = Column(SQLEnum(InvitationStatus), default=InvitationStatus.PENDING)
     message = Column(Text, nullable=True)
     expires_at = Column(DateTime, nullable=False)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
+    updated_at = Column(DateTime, server_default=DB_UTCNOW, onupdate=DB_UTCNOW)
+    
+    __table_args__ = (
+        # At most one pending invitation per player and team
+        Index(
+            "uq_team_invitations_pending", "team_id", "player_id",
+            unique=True,
+            postgresql_where=(status == InvitationStatus.PENDING),
+        ),
+        # A player's open invitations, newest first (get_my_invitations);
+        # expires_at is carried in the index so the expiry check needs no heap visit
+        Index(
+            "ix_team_invitations_pending_player_created", player_id, created_at.desc(),
+            postgresql_include=["expires_at"],
+            postgresql_where=(status == InvitationStatus.PENDING),
+        ),
+    )
     
     def __repr__(self):
         return f"<TeamInvitation player={self.player_id} team={self.team_id}>"
@@ -196,12 +331,12 @@ class PlayerTournament(Base):
     __tablename__ = "player_tournaments"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    player_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
-    tournament_id = Column(UUID(as_uuid=True), ForeignKey('tournaments.id'), nullable=False)
-    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id'), nullable=True)
+    player_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    tournament_id = Column(UUID(as_uuid=True), ForeignKey('tournaments.id', ondelete='CASCADE'), nullable=False)
+    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id', ondelete='SET NULL'), nullable=True)
     placement = Column(Integer, nullable=True)  # 1st, 2nd, 3rd, etc.
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
     
     def __repr__(self):
         return f"<PlayerTournament player={self.player_id} tournament={self.tournament_id}>"
@@ -212,13 +347,19 @@ class PlayerAvailability(Base):
     __tablename__ = "player_availability"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    player_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
+    player_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     date = Column(Date, nullable=False)
     is_available = Column(Boolean, default=True)
     notes = Column(String, nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
+    updated_at = Column(DateTime, server_default=DB_UTCNOW, onupdate=DB_UTCNOW)
+    
+    __table_args__ = (
+        # One entry per player and day; the upsert in set_date_availability
+        # targets it, and it serves date-range lookups per player
+        UniqueConstraint('player_id', 'date', name='unique_player_date'),
+    )
     
     def __repr__(self):
         return f"<PlayerAvailability player={self.player_id} date={self.date}>"
@@ -229,7 +370,7 @@ class PlayerRequirement(Base):
     __tablename__ = "player_requirements"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id'), nullable=False)
+    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id', ondelete='CASCADE'), nullable=False)
     required_role = Column(SQLEnum(PlayingRole), nullable=False)
     skill_level = Column(SQLEnum(SkillLevel), nullable=True)
     min_experience_years = Column(Integer, nullable=True)
@@ -243,8 +384,16 @@ class PlayerRequirement(Base):
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
+    updated_at = Column(DateTime, server_default=DB_UTCNOW, onupdate=DB_UTCNOW)
+    
+    __table_args__ = (
+        # Containment/overlap filters on formats (@>, &&)
+        Index("ix_player_requirements_preferred_formats_gin", "preferred_formats", postgresql_using="gin"),
+        # A team's requirements, optionally only active ones (get_team_requirements,
+        # the team profile); also serves the ON DELETE CASCADE from teams
+        Index("idx_player_requirements_active", "team_id", "is_active"),
+    )
     
     def __repr__(self):
         return f"<PlayerRequirement team={self.team_id} role={self.required_role}>"
@@ -255,14 +404,20 @@ class TeamTournamentParticipation(Base):
     __tablename__ = "team_tournament_participations"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id'), nullable=False)
-    tournament_id = Column(UUID(as_uuid=True), ForeignKey('tournaments.id'), nullable=False)
+    team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id', ondelete='CASCADE'), nullable=False)
+    tournament_id = Column(UUID(as_uuid=True), ForeignKey('tournaments.id', ondelete='CASCADE'), nullable=False)
     placement = Column(Integer, nullable=True)  # 1st, 2nd, 3rd, etc.
-    registration_date = Column(DateTime, default=datetime.utcnow)
+    registration_date = Column(DateTime, server_default=DB_UTCNOW)
     is_confirmed = Column(Boolean, default=False)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
+    updated_at = Column(DateTime, server_default=DB_UTCNOW, onupdate=DB_UTCNOW)
+    
+    __table_args__ = (
+        # One registration per team and tournament; register_team_for_tournament
+        # inserts with ON CONFLICT DO NOTHING against it
+        UniqueConstraint('team_id', 'tournament_id', name='unique_team_tournament'),
+    )
     
     def __repr__(self):
         return f"<TeamTournamentParticipation team={self.team_id} tournament={self.tournament_id}>"
@@ -273,13 +428,28 @@ class Conversation(Base):
     __tablename__ = "conversations"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    # The two participants — always store with user_a_id < user_b_id (string compare) for uniqueness
-    user_a_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False, index=True)
-    user_b_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    messages = relationship("Message", back_populates="conversation", order_by="Message.created_at")
+    # The two participants — always store with user_a_id < user_b_id (uuid order) for uniqueness
+    user_a_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    user_b_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    # Unread messages for each participant, kept in step by the chat endpoints
+    unread_for_a = Column(Integer, nullable=False, default=0)
+    unread_for_b = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
+    updated_at = Column(DateTime, server_default=DB_UTCNOW, onupdate=DB_UTCNOW)
+
+    __table_args__ = (
+        # One thread per pair; the unique index also serves user_a_id lookups.
+        UniqueConstraint('user_a_id', 'user_b_id', name='uq_conv_users'),
+        CheckConstraint('user_a_id < user_b_id', name='ck_conv_user_order'),
+        # Inbox listing: either side of the pair, most recently active first
+        Index("ix_conv_user_a_updated", user_a_id, updated_at.desc()),
+        Index("ix_conv_user_b_updated", user_b_id, updated_at.desc()),
+    )
+
+    messages = relationship(
+        "Message", back_populates="conversation", order_by="Message.created_at",
+        passive_deletes=True,
+    )
 
     def __repr__(self):
         return f"<Conversation {self.user_a_id} <-> {self.user_b_id}>"
@@ -290,13 +460,23 @@ class Message(Base):
     __tablename__ = "messages"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    conversation_id = Column(UUID(as_uuid=True), ForeignKey('conversations.id'), nullable=False, index=True)
-    sender_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey('conversations.id', ondelete='CASCADE'), nullable=False)
+    sender_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     content = Column(Text, nullable=False)
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=DB_UTCNOW)
 
     conversation = relationship("Conversation", back_populates="messages")
 
+    __table_args__ = (
+        # Thread pages come back pre-sorted; id breaks created_at ties for keyset paging
+        Index("ix_messages_conv_created", "conversation_id", "created_at", "id"),
+        # Unread badges only ever count unread rows, so index just those
+        Index(
+            "ix_messages_unread", "conversation_id", "sender_id",
+            postgresql_where=(is_read == False),
+        ),
+    )
+
     def __repr__(self):
         return f"<Message sender={self.sender_id} conv={self.conversation_id}>"
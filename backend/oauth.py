@@ -1,8 +1,26 @@
 import httpx
 from typing import Dict, Optional
+from urllib.parse import urlencode
 from fastapi import HTTPException, status
 from config import settings
 
+# Shared client so OAuth calls reuse pooled keep-alive connections (and TLS
+# sessions) instead of handshaking with Google on every login
+_oauth_client = httpx.AsyncClient(
+    timeout=10.0,
+    http2=True,
+    limits=httpx.Limits(
+        max_keepalive_connections=20,
+        max_connections=40,
+        keepalive_expiry=30,
+    ),
+)
+
+
+async def close_oauth_client() -> None:
+    """Close the shared OAuth HTTP client."""
+    await _oauth_client.aclose()
+
 
 class GoogleOAuth:
     """Google OAuth handler."""
@@ -13,39 +31,37 @@ class GoogleOAuth:
     @staticmethod
     async def exchange_code_for_token(code: str, redirect_uri: str) -> Dict:
         """Exchange authorization code for access token."""
-        async with httpx.AsyncClient() as client:
-            data = {
-                "code": code,
-                "client_id": settings.google_client_id,
-                "client_secret": settings.google_client_secret,
-                "redirect_uri": redirect_uri,
-                "grant_type": "authorization_code"
-            }
-            
-            response = await client.post(GoogleOAuth.TOKEN_URL, data=data)
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Failed to exchange code for token"
-                )
-            
-            return response.json()
+        data = {
+            "code": code,
+            "client_id": settings.google_client_id,
+            "client_secret": settings.google_client_secret,
+            "redirect_uri": redirect_uri,
+            "grant_type": "authorization_code"
+        }
+        
+        response = await _oauth_client.post(GoogleOAuth.TOKEN_URL, data=data)
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Failed to exchange code for token"
+            )
+        
+        return response.json()
     
     @staticmethod
     async def get_user_info(access_token: str) -> Dict:
         """Get user information from Google."""
-        async with httpx.AsyncClient() as client:
-            headers = {"Authorization": f"Bearer {access_token}"}
-            response = await client.get(GoogleOAuth.USER_INFO_URL, headers=headers)
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Failed to get user info from Google"
-                )
-            
-            return response.json()
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = await _oauth_client.get(GoogleOAuth.USER_INFO_URL, headers=headers)
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Failed to get user info from Google"
+            )
+        
+        return response.json()
     
     @staticmethod
     def get_authorization_url(redirect_uri: str) -> str:
@@ -60,5 +76,4 @@ class GoogleOAuth:
             "prompt": "consent"
         }
         
-        query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        return f"{base_url}?{query_string}"
+        return f"{base_url}?{urlencode(params)}"
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+# Header carrying the cursor for the next page of a keyset-paginated list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Encode a row's (created_at, id) sort key as an opaque cursor."""
+    return f"{created_at.isoformat()}_{row_id}"
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, UUID]]:
+    """Decode a cursor produced by encode_cursor."""
+    if not cursor:
+        return None
+    try:
+        created_at, row_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
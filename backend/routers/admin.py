@@ -1,21 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, func, select, true, tuple_, update
+from sqlalchemy.orm import aliased
 from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 from pydantic import BaseModel, ConfigDict
 
-from database import get_db
-from auth import get_current_user
+from database import get_async_db
+from pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from streaming import stream_json_array
+from auth import get_current_principal, invalidate_cached_principal, CurrentPrincipal
 from models import User, Team, Tournament, TeamApplication, ApplicationStatus
+from schemas import sent_fields
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 # ── Guard ──────────────────────────────────────────────────────────────────────
 
-def require_superuser(current_user: User = Depends(get_current_user)) -> User:
+def require_superuser(
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+) -> CurrentPrincipal:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -39,7 +45,7 @@ class AdminStats(BaseModel):
 class AdminUserRow(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
-    id: str
+    id: UUID
     email: str
     full_name: Optional[str] = None
     city: Optional[str] = None
@@ -55,7 +61,7 @@ class AdminUserRow(BaseModel):
 class AdminTeamRow(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
-    id: str
+    id: UUID
     name: str
     city: Optional[str] = None
     home_ground: Optional[str] = None
@@ -69,12 +75,16 @@ class AdminTeamRow(BaseModel):
 
 
 class AdminUserUpdate(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     is_active: Optional[bool] = None
     is_verified: Optional[bool] = None
     is_superuser: Optional[bool] = None
 
 
 class AdminTeamUpdate(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     is_active: Optional[bool] = None
     is_squad_full: Optional[bool] = None
 
@@ -82,26 +92,46 @@ class AdminTeamUpdate(BaseModel):
 # ── Endpoints ──────────────────────────────────────────────────────────────────
 
 @router.get("/stats", response_model=AdminStats)
-def get_admin_stats(
-    admin: User = Depends(require_superuser),
-    db: Session = Depends(get_db),
+async def get_admin_stats(
+    admin: CurrentPrincipal = Depends(require_superuser),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Return platform-wide statistics."""
     now = datetime.utcnow()
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-    total_users = db.query(func.count(User.id)).scalar() or 0
-    active_users = db.query(func.count(User.id)).filter(User.is_active == True).scalar() or 0
-    banned_users = db.query(func.count(User.id)).filter(User.is_active == False).scalar() or 0
-    total_teams = db.query(func.count(Team.id)).scalar() or 0
-    active_teams = db.query(func.count(Team.id)).filter(Team.is_active == True).scalar() or 0
-    total_tournaments = db.query(func.count(Tournament.id)).scalar() or 0
-    new_users = (
-        db.query(func.count(User.id))
-        .filter(User.created_at >= month_start)
-        .scalar()
-        or 0
-    )
+    # One round-trip: a single-row aggregate per table, cross-joined together
+    user_counts = select(
+        func.count(User.id).label("total"),
+        func.count(User.id).filter(User.is_active.is_(True)).label("active"),
+        func.count(User.id).filter(User.is_active.is_(False)).label("banned"),
+        func.count(User.id).filter(User.created_at >= month_start).label("new"),
+    ).subquery()
+    team_counts = select(
+        func.count(Team.id).label("total"),
+        func.count(Team.id).filter(Team.is_active.is_(True)).label("active"),
+    ).subquery()
+    tournament_counts = select(
+        func.count(Tournament.id).label("total"),
+    ).subquery()
+    stmt = select(
+        user_counts.c.total,
+        user_counts.c.active,
+        user_counts.c.banned,
+        user_counts.c.new,
+        team_counts.c.total,
+        team_counts.c.active,
+        tournament_counts.c.total,
+    ).select_from(user_counts).join(team_counts, true()).join(tournament_counts, true())
+    (
+        total_users,
+        active_users,
+        banned_users,
+        new_users,
+        total_teams,
+        active_teams,
+        total_tournaments,
+    ) = (await db.execute(stmt)).one()
 
     return AdminStats(
         total_users=total_users,
@@ -115,192 +145,179 @@ def get_admin_stats(
 
 
 @router.get("/users", response_model=List[AdminUserRow])
-def list_users(
+async def list_users(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    admin: User = Depends(require_superuser),
-    db: Session = Depends(get_db),
+    admin: CurrentPrincipal = Depends(require_superuser),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """List all users with optional search."""
-    q = db.query(User)
+    """List all users with optional search.
+    
+    Pass the previous page's X-Next-Cursor header as ``cursor`` to page
+    without OFFSET; ``skip`` is still honoured when no cursor is given.
+    """
+    q = select(User)
     if search:
         term = f"%{search.lower()}%"
-        q = q.filter(
+        q = q.where(
             User.email.ilike(term) | User.full_name.ilike(term)
         )
-    users = q.order_by(User.created_at.desc()).offset(skip).limit(limit).all()
-    return [
-        AdminUserRow(
-            id=str(u.id),
-            email=u.email,
-            full_name=u.full_name,
-            city=u.city,
-            roles=list(u.roles or []),
-            playing_role=u.playing_role,
-            is_active=u.is_active,
-            is_verified=u.is_verified,
-            is_superuser=u.is_superuser,
-            created_at=u.created_at,
-            last_login=u.last_login,
-        )
-        for u in users
-    ]
+    after = decode_cursor(cursor)
+    if after:
+        q = q.where(tuple_(User.created_at, User.id) < after)
+    else:
+        q = q.offset(skip)
+    users = (
+        await db.scalars(q.order_by(User.created_at.desc(), User.id.desc()).limit(limit))
+    ).all()
+    if len(users) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(users[-1].created_at, users[-1].id)
+    return [AdminUserRow.model_validate(u) for u in users]
 
 
 @router.patch("/users/{user_id}", response_model=AdminUserRow)
-def update_user(
-    user_id: str,
+async def update_user(
+    user_id: UUID,
     data: AdminUserUpdate,
-    admin: User = Depends(require_superuser),
-    db: Session = Depends(get_db),
+    admin: CurrentPrincipal = Depends(require_superuser),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Ban/unban, verify, or promote a user."""
-    try:
-        uid = UUID(user_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid user ID")
+    # Prevent admin from demoting themselves
+    if user_id == admin.id and data.is_superuser is False:
+        raise HTTPException(status_code=400, detail="Cannot remove your own superuser status")
 
-    user = db.query(User).filter(User.id == uid).first()
+    # Update and read back the row in one round-trip
+    changes = sent_fields(data)
+    if changes:
+        stmt = update(User).where(User.id == user_id).values(**changes).returning(User)
+        user = (await db.execute(stmt)).scalar_one_or_none()
+    else:
+        user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Prevent admin from demoting themselves
-    if str(user.id) == str(admin.id) and data.is_superuser is False:
-        raise HTTPException(status_code=400, detail="Cannot remove your own superuser status")
-
-    for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(user, field, value)
-
-    db.commit()
-    db.refresh(user)
-    return AdminUserRow(
-        id=str(user.id),
-        email=user.email,
-        full_name=user.full_name,
-        city=user.city,
-        roles=list(user.roles or []),
-        playing_role=user.playing_role,
-        is_active=user.is_active,
-        is_verified=user.is_verified,
-        is_superuser=user.is_superuser,
-        created_at=user.created_at,
-        last_login=user.last_login,
-    )
+    await db.commit()
+    invalidate_cached_principal(user_id)
+    return AdminUserRow.model_validate(user)
 
 
 @router.delete("/users/{user_id}", status_code=204)
-def delete_user(
-    user_id: str,
-    admin: User = Depends(require_superuser),
-    db: Session = Depends(get_db),
+async def delete_user(
+    user_id: UUID,
+    admin: CurrentPrincipal = Depends(require_superuser),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Permanently delete a user account."""
-    try:
-        uid = UUID(user_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid user ID")
-
-    if str(uid) == str(admin.id):
+    if user_id == admin.id:
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
 
-    user = db.query(User).filter(User.id == uid).first()
-    if not user:
+    # Dependent rows are removed by ON DELETE CASCADE in the database
+    result = await db.execute(delete(User).where(User.id == user_id))
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(user)
-    db.commit()
+    await db.commit()
+    invalidate_cached_principal(user_id)
+
+
+def _team_row_select(t=Team):
+    """Select exactly the AdminTeamRow columns for ``t`` joined to its captain."""
+    return select(
+        t.id,
+        t.name,
+        t.city,
+        t.home_ground,
+        User.full_name.label("captain_name"),
+        User.email.label("captain_email"),
+        func.coalesce(t.current_player_count, 0).label("current_player_count"),
+        func.coalesce(t.max_players, 15).label("max_players"),
+        t.is_active,
+        t.is_squad_full,
+        t.created_at,
+    ).outerjoin(User, User.id == t.captain_id)
 
 
 @router.get("/teams", response_model=List[AdminTeamRow])
-def list_teams(
+async def list_teams(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    admin: User = Depends(require_superuser),
-    db: Session = Depends(get_db),
+    admin: CurrentPrincipal = Depends(require_superuser),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """List all teams with optional search."""
-    q = db.query(Team)
+    """List all teams with optional search.
+    
+    Supports the same ``cursor`` paging as list_users. Rows are streamed
+    from a server-side cursor rather than loaded into memory first.
+    """
+    # Captain details come from the same query instead of one lookup per team
+    q = _team_row_select()
     if search:
-        q = q.filter(Team.name.ilike(f"%{search}%"))
-    teams = q.order_by(Team.created_at.desc()).offset(skip).limit(limit).all()
-
-    result = []
-    for t in teams:
-        captain = db.query(User).filter(User.id == t.captain_id).first()
-        result.append(
-            AdminTeamRow(
-                id=str(t.id),
-                name=t.name,
-                city=t.city,
-                home_ground=t.home_ground,
-                captain_name=captain.full_name if captain else None,
-                captain_email=captain.email if captain else None,
-                current_player_count=t.current_player_count or 0,
-                max_players=t.max_players or 15,
-                is_active=t.is_active,
-                is_squad_full=t.is_squad_full,
-                created_at=t.created_at,
-            )
+        q = q.where(Team.name.ilike(f"%{search}%"))
+    after = decode_cursor(cursor)
+    if after:
+        q = q.where(tuple_(Team.created_at, Team.id) < after)
+    else:
+        q = q.offset(skip)
+    q = q.order_by(Team.created_at.desc(), Team.id.desc())
+
+    # Headers go out before the body, so find the page's last key up front
+    # with an index-only lookup of the row at position `limit`
+    last = (
+        await db.execute(
+            q.with_only_columns(Team.created_at, Team.id).offset(
+                (0 if after else skip) + limit - 1
+            ).limit(1)
         )
-    return result
+    ).one_or_none()
+    headers = {NEXT_CURSOR_HEADER: encode_cursor(*last)} if last else None
+
+    return stream_json_array(q.limit(limit), AdminTeamRow, headers=headers)
 
 
 @router.patch("/teams/{team_id}", response_model=AdminTeamRow)
-def update_team(
-    team_id: str,
+async def update_team(
+    team_id: UUID,
     data: AdminTeamUpdate,
-    admin: User = Depends(require_superuser),
-    db: Session = Depends(get_db),
+    admin: CurrentPrincipal = Depends(require_superuser),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Activate/deactivate a team."""
-    try:
-        tid = UUID(team_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid team ID")
-
-    team = db.query(Team).filter(Team.id == tid).first()
-    if not team:
+    # Update the team and join its captain in one round-trip
+    changes = sent_fields(data)
+    if changes:
+        updated = (
+            update(Team).where(Team.id == team_id).values(**changes)
+            .returning(*Team.__table__.c)
+            .cte("updated_team")
+        )
+        team_row = aliased(Team, updated)
+    else:
+        team_row = Team
+    stmt = _team_row_select(team_row).where(team_row.id == team_id)
+    row = (await db.execute(stmt)).one_or_none()
+    if not row:
         raise HTTPException(status_code=404, detail="Team not found")
 
-    for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(team, field, value)
-
-    db.commit()
-    db.refresh(team)
-
-    captain = db.query(User).filter(User.id == team.captain_id).first()
-    return AdminTeamRow(
-        id=str(team.id),
-        name=team.name,
-        city=team.city,
-        home_ground=team.home_ground,
-        captain_name=captain.full_name if captain else None,
-        captain_email=captain.email if captain else None,
-        current_player_count=team.current_player_count or 0,
-        max_players=team.max_players or 15,
-        is_active=team.is_active,
-        is_squad_full=team.is_squad_full,
-        created_at=team.created_at,
-    )
+    await db.commit()
+    return AdminTeamRow.model_validate(row)
 
 
 @router.delete("/teams/{team_id}", status_code=204)
-def delete_team(
-    team_id: str,
-    admin: User = Depends(require_superuser),
-    db: Session = Depends(get_db),
+async def delete_team(
+    team_id: UUID,
+    admin: CurrentPrincipal = Depends(require_superuser),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Permanently delete a team."""
-    try:
-        tid = UUID(team_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid team ID")
-
-    team = db.query(Team).filter(Team.id == tid).first()
-    if not team:
+    # Dependent rows are removed by ON DELETE CASCADE in the database
+    result = await db.execute(delete(Team).where(Team.id == team_id))
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Team not found")
 
-    db.delete(team)
-    db.commit()
+    await db.commit()
@@ -1,17 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import Dict
 
-from database import get_db
-from models import User, AuthProvider, RefreshToken
+from database import get_async_db
+from models import User, AuthProvider
 from schemas import (
     UserCreate, UserLogin, UserResponse, Token, 
     RefreshTokenRequest, GoogleOAuthRequest
 )
 from auth import (
-    get_password_hash, authenticate_user, create_access_token,
-    create_refresh_token, verify_token, get_current_user, revoke_refresh_token
+    get_password_hash_async, authenticate_user, create_access_token,
+    create_refresh_token, verify_token, get_current_user, revoke_refresh_token,
+    rotate_refresh_token, get_current_principal, CurrentPrincipal
 )
 from oauth import GoogleOAuth
 from config import settings
@@ -20,11 +22,11 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user with email and password."""
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User.id).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -32,7 +34,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         email=user_data.email,
         full_name=user_data.full_name,
@@ -43,12 +45,12 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.flush()  # Assign the user ID without committing yet
     
-    # Create tokens
+    # Create tokens; the user and refresh token are committed together
     access_token = create_access_token(data={"sub": str(db_user.id)})
-    refresh_token = create_refresh_token(db_user.id, db)
+    refresh_token = await create_refresh_token(db_user.id, db, commit=False)
+    await db.commit()
     
     return Token(
         access_token=access_token,
@@ -57,10 +59,10 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login with email and password."""
     
-    user = authenticate_user(db, credentials.email, credentials.password)
+    user = await authenticate_user(db, credentials.email, credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -70,11 +72,11 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     
     # Update last login
     user.last_login = datetime.utcnow()
-    db.commit()
     
-    # Create tokens
+    # Create tokens; last_login and the refresh token are committed together
     access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(user.id, db)
+    refresh_token = await create_refresh_token(user.id, db, commit=False)
+    await db.commit()
     
     return Token(
         access_token=access_token,
@@ -83,7 +85,7 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/google", response_model=Token)
-async def google_auth(oauth_data: GoogleOAuthRequest, db: Session = Depends(get_db)):
+async def google_auth(oauth_data: GoogleOAuthRequest, db: AsyncSession = Depends(get_async_db)):
     """Authenticate with Google OAuth."""
     
     # Exchange code for tokens
@@ -96,7 +98,7 @@ async def google_auth(oauth_data: GoogleOAuthRequest, db: Session = Depends(get_
     user_info = await GoogleOAuth.get_user_info(token_response["access_token"])
     
     # Check if user exists
-    user = db.query(User).filter(User.email == user_info["email"]).first()
+    user = await db.scalar(select(User).where(User.email == user_info["email"]))
     
     if not user:
         # Create new user
@@ -110,8 +112,7 @@ async def google_auth(oauth_data: GoogleOAuthRequest, db: Session = Depends(get_
             roles=["player"]  # Default role
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.flush()  # Assign the user ID without committing yet
     else:
         # Update existing user
         if user.auth_provider != AuthProvider.GOOGLE:
@@ -120,11 +121,11 @@ async def google_auth(oauth_data: GoogleOAuthRequest, db: Session = Depends(get_
                 detail="Email already registered with different provider"
             )
         user.last_login = datetime.utcnow()
-        db.commit()
     
-    # Create tokens
+    # Create tokens; user changes and the refresh token are committed together
     access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(user.id, db)
+    refresh_token = await create_refresh_token(user.id, db, commit=False)
+    await db.commit()
     
     return Token(
         access_token=access_token,
@@ -135,46 +136,23 @@ async def google_auth(oauth_data: GoogleOAuthRequest, db: Session = Depends(get_
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
     token_request: RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Refresh access token using refresh token."""
     
     # Verify refresh token
     token_data = verify_token(token_request.refresh_token, token_type="refresh")
     
-    # Check if token exists and is not revoked
-    db_token = db.query(RefreshToken).filter(
-        RefreshToken.token == token_request.refresh_token,
-        RefreshToken.is_revoked == False
-    ).first()
-    
-    if not db_token:
+    # Revoke it and issue the replacement in one statement. Unknown, revoked or
+    # orphaned tokens match nothing (expiry is enforced by the JWT exp claim)
+    new_refresh_token = await rotate_refresh_token(db, token_data)
+    if new_refresh_token is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token"
         )
     
-    # Check if token is expired
-    if db_token.expires_at < datetime.utcnow():
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh token expired"
-        )
-    
-    # Get user
-    user = db.query(User).filter(User.id == token_data.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    # Create new tokens
-    access_token = create_access_token(data={"sub": str(user.id)})
-    new_refresh_token = create_refresh_token(user.id, db)
-    
-    # Revoke old refresh token
-    revoke_refresh_token(db, token_request.refresh_token)
+    access_token = create_access_token(data={"sub": str(token_data.user_id)})
     
     return Token(
         access_token=access_token,
@@ -185,12 +163,12 @@ async def refresh_token(
 @router.post("/logout")
 async def logout(
     token_request: RefreshTokenRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Logout user by revoking refresh token."""
     
-    revoke_refresh_token(db, token_request.refresh_token)
+    await revoke_refresh_token(db, token_request.refresh_token)
     return {"message": "Successfully logged out"}
 
 
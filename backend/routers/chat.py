@@ -1,69 +1,117 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import and_, case, exists, or_, func, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from typing import List, Optional
 from uuid import UUID
 
-from database import get_db
-from auth import get_current_user
-from models import User, Conversation, Message
+from database import get_async_db
+from pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from streaming import stream_json_array
+from auth import get_current_principal, CurrentPrincipal
+from models import DB_UTCNOW, User, Conversation, Message
 from schemas import ConversationOut, ConversationParticipant, MessageOut, MessageCreate
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+# Serializes a conversation list straight to JSON bytes in pydantic-core
+_conversation_list = TypeAdapter(List[ConversationOut])
+
 
 # ── helpers ────────────────────────────────────────────────────────────────────
 
 def _canonical(a: UUID, b: UUID):
     """Return (user_a_id, user_b_id) with the smaller UUID first for uniqueness."""
-    return (a, b) if str(a) < str(b) else (b, a)
+    # UUID.int order is Postgres uuid order, as ck_conv_user_order requires
+    return (a, b) if a.int < b.int else (b, a)
+
+
+def _message_row_select(m=Message):
+    """Select exactly the MessageOut columns for ``m``."""
+    return select(m.id, m.conversation_id, m.sender_id, m.content, m.is_read, m.created_at)
+
+
+def _is_participant(user_id: UUID):
+    """SQL filter for conversations that ``user_id`` is part of."""
+    return or_(Conversation.user_a_id == user_id, Conversation.user_b_id == user_id)
+
 
+async def _participant_check_failed(conversation_id: UUID, db: AsyncSession) -> HTTPException:
+    """Tell a missing conversation (404) from one the caller isn't in (403).
+    
+    Only runs on the miss path, after a participant-filtered statement
+    matched nothing.
+    """
+    exists = await db.scalar(select(literal(1)).where(Conversation.id == conversation_id))
+    if exists is None:
+        return HTTPException(status_code=404, detail="Conversation not found")
+    return HTTPException(status_code=403, detail="Not a participant")
 
-def _make_message_out(m: Message) -> MessageOut:
-    return MessageOut(
-        id=str(m.id),
-        conversation_id=str(m.conversation_id),
-        sender_id=str(m.sender_id),
-        content=m.content,
-        is_read=m.is_read,
-        created_at=m.created_at,
+
+def _other_user_id(conv: Conversation, current_user_id: UUID) -> UUID:
+    return conv.user_b_id if conv.user_a_id == current_user_id else conv.user_a_id
+
+
+def _unread_for(user_id: UUID):
+    """SQL expression for ``user_id``'s unread counter on a conversation."""
+    return case(
+        (Conversation.user_a_id == user_id, Conversation.unread_for_a),
+        else_=Conversation.unread_for_b,
     )
 
 
+async def _load_conversation_context(
+    convs: List[Conversation],
+    current_user_id: UUID,
+    db: AsyncSession,
+):
+    """Batch-load the other participants and last messages.
+    
+    Two queries regardless of how many conversations are passed in.
+    """
+    if not convs:
+        return {}, {}
+    conv_ids = [c.id for c in convs]
+    other_ids = {_other_user_id(c, current_user_id) for c in convs}
+
+    # Only the ConversationParticipant / MessageOut columns, not whole rows
+    users_by_id = {
+        u.id: u
+        for u in await db.execute(
+            select(User.id, User.full_name, User.avatar_url).where(User.id.in_(other_ids))
+        )
+    }
+
+    # DISTINCT ON keeps the first row per conversation under this ordering
+    last_msg_by_conv = {
+        m.conversation_id: m
+        for m in await db.execute(
+            _message_row_select()
+            .where(Message.conversation_id.in_(conv_ids))
+            .distinct(Message.conversation_id)
+            .order_by(Message.conversation_id, Message.created_at.desc(), Message.id.desc())
+        )
+    }
+
+    return users_by_id, last_msg_by_conv
+
+
 def _make_conversation_out(
     conv: Conversation,
     current_user_id: UUID,
-    db: Session,
+    users_by_id: dict,
+    last_msg_by_conv: dict,
 ) -> ConversationOut:
-    other_id = conv.user_b_id if str(conv.user_a_id) == str(current_user_id) else conv.user_a_id
-    other = db.query(User).filter(User.id == other_id).first()
-
-    last_msg = (
-        db.query(Message)
-        .filter(Message.conversation_id == conv.id)
-        .order_by(Message.created_at.desc())
-        .first()
-    )
-
-    unread = (
-        db.query(func.count(Message.id))
-        .filter(
-            Message.conversation_id == conv.id,
-            Message.sender_id != current_user_id,
-            Message.is_read == False,
-        )
-        .scalar()
-        or 0
-    )
+    other_id = _other_user_id(conv, current_user_id)
+    other = users_by_id.get(other_id)
+    unread = conv.unread_for_a if conv.user_a_id == current_user_id else conv.unread_for_b
 
     return ConversationOut(
-        id=str(conv.id),
-        other_user=ConversationParticipant(
-            id=str(other.id) if other else str(other_id),
-            full_name=other.full_name if other else None,
-            avatar_url=other.avatar_url if other else None,
-        ),
-        last_message=_make_message_out(last_msg) if last_msg else None,
+        id=conv.id,
+        other_user=other or ConversationParticipant(id=other_id),
+        last_message=last_msg_by_conv.get(conv.id),
         unread_count=unread,
         updated_at=conv.updated_at,
     )
@@ -72,159 +120,201 @@ def _make_conversation_out(
 # ── Endpoints ──────────────────────────────────────────────────────────────────
 
 @router.get("/conversations", response_model=List[ConversationOut])
-def list_conversations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def list_conversations(
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Return all conversations for the current user, newest first."""
+    """Return all conversations for the current user, newest first.
+    
+    The list is dumped to JSON here, skipping FastAPI's second validation
+    pass over the already-built models.
+    """
     convs = (
-        db.query(Conversation)
-        .filter(
-            or_(
-                Conversation.user_a_id == current_user.id,
-                Conversation.user_b_id == current_user.id,
-            )
+        await db.scalars(
+            select(Conversation)
+            .where(_is_participant(current_user.id))
+            .order_by(Conversation.updated_at.desc())
         )
-        .order_by(Conversation.updated_at.desc())
-        .all()
+    ).all()
+    context = await _load_conversation_context(convs, current_user.id, db)
+    body = _conversation_list.dump_json(
+        [_make_conversation_out(c, current_user.id, *context) for c in convs]
     )
-    return [_make_conversation_out(c, current_user.id, db) for c in convs]
+    return Response(body, media_type="application/json")
 
 
 @router.post("/conversations", response_model=ConversationOut, status_code=status.HTTP_200_OK)
-def get_or_create_conversation(
-    other_user_id: str = Query(..., description="UUID of the other participant"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_or_create_conversation(
+    other_user_id: UUID = Query(..., description="UUID of the other participant"),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get an existing conversation with a user, or create one."""
-    try:
-        other_uuid = UUID(other_user_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid user ID")
-
-    if str(other_uuid) == str(current_user.id):
+    if other_user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot chat with yourself")
 
-    other = db.query(User).filter(User.id == other_uuid).first()
-    if not other:
+    if not await db.scalar(select(exists().where(User.id == other_user_id))):
         raise HTTPException(status_code=404, detail="User not found")
 
-    a_id, b_id = _canonical(current_user.id, other_uuid)
+    a_id, b_id = _canonical(current_user.id, other_user_id)
 
-    conv = (
-        db.query(Conversation)
-        .filter(
-            Conversation.user_a_id == a_id,
-            Conversation.user_b_id == b_id,
-        )
-        .first()
+    # Create unless it already exists; uq_conv_users makes two users opening
+    # the same DM at once safe, and RETURNING comes back empty for the loser
+    conv = await db.scalar(
+        insert(Conversation)
+        .values(user_a_id=a_id, user_b_id=b_id)
+        .on_conflict_do_nothing(constraint="uq_conv_users")
+        .returning(Conversation)
     )
+    if conv is None:
+        conv = await db.scalar(
+            select(Conversation).where(
+                Conversation.user_a_id == a_id,
+                Conversation.user_b_id == b_id,
+            )
+        )
+    await db.commit()
 
-    if not conv:
-        conv = Conversation(user_a_id=a_id, user_b_id=b_id)
-        db.add(conv)
-        db.commit()
-        db.refresh(conv)
-
-    return _make_conversation_out(conv, current_user.id, db)
+    context = await _load_conversation_context([conv], current_user.id, db)
+    return _make_conversation_out(conv, current_user.id, *context)
 
 
 @router.get("/conversations/{conversation_id}/messages", response_model=List[MessageOut])
-def get_messages(
-    conversation_id: str,
+async def get_messages(
+    conversation_id: UUID,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    before: Optional[str] = Query(None, description="Return the page of messages older than this cursor"),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Return messages in a conversation (oldest first). Marks unread messages as read."""
-    try:
-        conv_uuid = UUID(conversation_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid conversation ID")
-
-    conv = db.query(Conversation).filter(Conversation.id == conv_uuid).first()
-    if not conv:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-
-    # Check participant
-    if str(conv.user_a_id) != str(current_user.id) and str(conv.user_b_id) != str(current_user.id):
-        raise HTTPException(status_code=403, detail="Not a participant")
-
-    # Mark incoming messages as read
-    db.query(Message).filter(
-        Message.conversation_id == conv_uuid,
-        Message.sender_id != current_user.id,
-        Message.is_read == False,
-    ).update({"is_read": True})
-    db.commit()
-
-    messages = (
-        db.query(Message)
-        .filter(Message.conversation_id == conv_uuid)
-        .order_by(Message.created_at.asc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    """Return messages in a conversation (oldest first). Marks unread messages as read.
+    
+    Pass the previous page's X-Next-Cursor header as ``cursor`` to page
+    forward without OFFSET, or as ``before`` to page back through older
+    history; ``skip`` is still honoured when neither is given. The page is
+    streamed from a server-side cursor rather than loaded into memory first.
+    """
+    # Index-only membership check rather than loading the conversation
+    is_participant = await db.scalar(
+        select(literal(1)).where(
+            Conversation.id == conversation_id, _is_participant(current_user.id)
+        )
     )
-    return [_make_message_out(m) for m in messages]
+    if is_participant is None:
+        raise await _participant_check_failed(conversation_id, db)
+
+    after = decode_cursor(cursor)
+    older_than = decode_cursor(before)
+
+    # Mark incoming messages as read and take them off the caller's counter
+    marked = await db.execute(
+        update(Message)
+        .where(
+            Message.conversation_id == conversation_id,
+            Message.sender_id != current_user.id,
+            Message.is_read == False,
+        )
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if marked.rowcount:
+        is_a = Conversation.user_a_id == current_user.id
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(
+                unread_for_a=case(
+                    (is_a, func.greatest(Conversation.unread_for_a - marked.rowcount, 0)),
+                    else_=Conversation.unread_for_a,
+                ),
+                unread_for_b=case(
+                    (is_a, Conversation.unread_for_b),
+                    else_=func.greatest(Conversation.unread_for_b - marked.rowcount, 0),
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    q = select(Message).where(Message.conversation_id == conversation_id)
+    if older_than:
+        q = q.where(tuple_(Message.created_at, Message.id) < older_than)
+        q = q.order_by(Message.created_at.desc(), Message.id.desc())
+    else:
+        if after:
+            q = q.where(tuple_(Message.created_at, Message.id) > after)
+        else:
+            q = q.offset(skip)
+        q = q.order_by(Message.created_at.asc(), Message.id.asc())
+
+    # Headers go out before the body, so find the page's last key up front;
+    # it is where the next page in the same direction starts
+    last = (
+        await db.execute(
+            q.with_only_columns(Message.created_at, Message.id).offset(
+                (0 if after or older_than else skip) + limit - 1
+            ).limit(1)
+        )
+    ).one_or_none()
+    await db.commit()
+    headers = {NEXT_CURSOR_HEADER: encode_cursor(*last)} if last else None
+
+    # Stream the page oldest-first; a backwards page is re-sorted here
+    m = aliased(Message, q.limit(limit).subquery())
+    stmt = _message_row_select(m).order_by(m.created_at.asc(), m.id.asc())
+    return stream_json_array(stmt, MessageOut, headers=headers)
 
 
 @router.post("/conversations/{conversation_id}/messages", response_model=MessageOut, status_code=201)
-def send_message(
-    conversation_id: str,
+async def send_message(
+    conversation_id: UUID,
     body: MessageCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Send a message in a conversation."""
-    try:
-        conv_uuid = UUID(conversation_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid conversation ID")
-
-    conv = db.query(Conversation).filter(Conversation.id == conv_uuid).first()
-    if not conv:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-
-    if str(conv.user_a_id) != str(current_user.id) and str(conv.user_b_id) != str(current_user.id):
-        raise HTTPException(status_code=403, detail="Not a participant")
+    # Bump conversation updated_at for sorting, stamped by the database clock,
+    # and count the message as unread for the other participant; the
+    # participant filter makes this the membership check as well
+    bumped = await db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id, _is_participant(current_user.id))
+        .values(
+            updated_at=DB_UTCNOW,
+            unread_for_a=Conversation.unread_for_a
+            + case((Conversation.user_b_id == current_user.id, 1), else_=0),
+            unread_for_b=Conversation.unread_for_b
+            + case((Conversation.user_a_id == current_user.id, 1), else_=0),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if bumped.rowcount == 0:
+        raise await _participant_check_failed(conversation_id, db)
 
     msg = Message(
-        conversation_id=conv_uuid,
+        conversation_id=conversation_id,
         sender_id=current_user.id,
         content=body.content.strip(),
     )
     db.add(msg)
+    # created_at comes from its server default via RETURNING (eager_defaults),
+    # so no refresh is needed
+    await db.commit()
 
-    # Bump conversation updated_at for sorting
-    from datetime import datetime
-    conv.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(msg)
-
-    return _make_message_out(msg)
+    return msg
 
 
 @router.get("/unread-count")
-def get_unread_count(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_unread_count(
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Total number of unread messages across all conversations."""
-    count = (
-        db.query(func.count(Message.id))
-        .join(Conversation, Message.conversation_id == Conversation.id)
-        .filter(
-            or_(
-                Conversation.user_a_id == current_user.id,
-                Conversation.user_b_id == current_user.id,
-            ),
-            Message.sender_id != current_user.id,
-            Message.is_read == False,
+    # Summed from the per-conversation counters; no message rows are read
+    count = await db.scalar(
+        select(func.coalesce(func.sum(_unread_for(current_user.id)), 0)).where(
+            _is_participant(current_user.id)
         )
-        .scalar()
-        or 0
     )
     return {"unread_count": count}
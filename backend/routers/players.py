@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List
-from datetime import datetime, timedelta
+import threading
+from cachetools import TTLCache
+from pydantic import TypeAdapter
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import and_, exists, func, literal, or_, select, text, true, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from datetime import date, datetime, timedelta
 from uuid import UUID
 
-from database import get_db
-from auth import get_current_user
+from database import get_async_db
+from pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from streaming import stream_json_array
+from auth import get_current_user, get_current_principal, CurrentPrincipal
 from models import (
-    User, Team, Tournament, TeamApplication, TeamInvitation, 
+    DB_UTCNOW, User, Team, Tournament, TeamApplication, TeamInvitation, 
     PlayerTournament, PlayerAvailability, ApplicationStatus, InvitationStatus
 )
 from schemas import (
@@ -16,166 +22,291 @@ from schemas import (
     TeamApplicationCreate, TeamApplicationResponse, TeamApplicationUpdate,
     TeamInvitationResponse, TeamInvitationUpdate,
     AvailabilityToggle, WeeklyAvailabilityUpdate, PlayerAvailabilityCreate, PlayerAvailabilityResponse,
+    AvailabilityCalendarResponse,
     PlayerProfileResponse, PlayerProfileUpdate,
     DiscoverPlayerCard, DiscoverTeamCard,
+    sent_fields,
 )
 
 router = APIRouter(prefix="/players", tags=["players"])
 
+# Serialized discover pages and their headers keyed by (kind, caller, page), so
+# a swipe session that re-requests a page skips the database. Profile, availability and team edits
+# show up in other users' decks within DISCOVER_CACHE_TTL seconds.
+DISCOVER_CACHE_TTL = 30
+_discover_cache = TTLCache(maxsize=10_000, ttl=DISCOVER_CACHE_TTL)
+_discover_cache_lock = threading.Lock()
+
+# Cards are built from trusted rows with model_construct and serialized once
+# here; returning the bytes as a Response skips response_model re-validation
+_player_cards = TypeAdapter(List[DiscoverPlayerCard])
+_team_cards = TypeAdapter(List[DiscoverTeamCard])
+
 
 @router.get("/discover", response_model=List[DiscoverPlayerCard])
-def discover_players(
+async def discover_players(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=50),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Return available players for captains to swipe on (excludes the caller)."""
-    players = (
-        db.query(User)
-        .filter(
+    """Return available players for captains to swipe on (excludes the caller).
+    
+    Pass the previous page's X-Next-Cursor header as ``cursor`` to page
+    without OFFSET; ``skip`` is still honoured when no cursor is given.
+    """
+    cache_key = ("players", current_user.id, cursor or skip, limit)
+    with _discover_cache_lock:
+        cached = _discover_cache.get(cache_key)
+    if cached is not None:
+        body, headers = cached
+        return Response(body, media_type="application/json", headers=headers)
+    
+    # Only the card's columns (plus the sort key); rows are plain tuples
+    q = (
+        select(
+            User.id,
+            func.coalesce(func.nullif(User.full_name, ""), User.email).label("full_name"),
+            User.avatar_url,
+            User.city,
+            User.playing_role,
+            User.batting_style,
+            User.bowling_style,
+            User.experience_years,
+            User.preferred_formats,
+            User.is_available,
+            User.created_at,
+        )
+        .where(
             User.id != current_user.id,
             User.is_active == True,
             User.profile_visible == True,
         )
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
-    return [
-        DiscoverPlayerCard(
-            id=str(p.id),
-            full_name=p.full_name or p.email,
+    after = decode_cursor(cursor)
+    if after:
+        q = q.where(tuple_(User.created_at, User.id) < after)
+    else:
+        q = q.offset(skip)
+    rows = (
+        await db.execute(q.order_by(User.created_at.desc(), User.id.desc()).limit(limit))
+    ).all()
+    headers = (
+        {NEXT_CURSOR_HEADER: encode_cursor(rows[-1].created_at, rows[-1].id)}
+        if len(rows) == limit else None
+    )
+    # The driver already hands back text[] as a fresh list per row, so it's
+    # used as-is rather than copied
+    cards = [
+        DiscoverPlayerCard.model_construct(
+            id=p.id,
+            full_name=p.full_name,
             avatar_url=p.avatar_url,
             city=p.city,
             playing_role=p.playing_role,
             batting_style=p.batting_style,
             bowling_style=p.bowling_style,
             experience_years=p.experience_years,
-            preferred_formats=list(p.preferred_formats or []),
+            preferred_formats=p.preferred_formats or [],
             is_available=p.is_available,
         )
-        for p in players
+        for p in rows
     ]
+    body = _player_cards.dump_json(cards)
+    with _discover_cache_lock:
+        _discover_cache[cache_key] = (body, headers)
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @router.get("/discover/teams", response_model=List[DiscoverTeamCard])
-def discover_teams(
+async def discover_teams(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=50),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Return active teams for players to swipe on (excludes teams the caller captains)."""
-    teams = (
-        db.query(Team)
-        .filter(
+    """Return active teams for players to swipe on (excludes teams the caller captains).
+    
+    Pass the previous page's X-Next-Cursor header as ``cursor`` to page
+    without OFFSET; ``skip`` is still honoured when no cursor is given.
+    """
+    cache_key = ("teams", current_user.id, cursor or skip, limit)
+    with _discover_cache_lock:
+        cached = _discover_cache.get(cache_key)
+    if cached is not None:
+        body, headers = cached
+        return Response(body, media_type="application/json", headers=headers)
+    
+    # Only the card's columns, with the captain's name from the same query
+    q = (
+        select(
+            Team.id,
+            Team.name,
+            Team.logo_url,
+            Team.city,
+            Team.home_ground,
+            Team.description,
+            Team.preferred_formats,
+            func.coalesce(Team.current_player_count, 0).label("current_player_count"),
+            func.coalesce(Team.max_players, 15).label("max_players"),
+            User.full_name.label("captain_name"),
+            Team.captain_id,
+            Team.created_at,
+        )
+        .outerjoin(User, User.id == Team.captain_id)
+        .where(
             Team.is_active == True,
             Team.is_squad_full == False,
             Team.captain_id != current_user.id,
         )
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
-    result = []
-    for t in teams:
-        captain = db.query(User).filter(User.id == t.captain_id).first()
-        result.append(
-            DiscoverTeamCard(
-                id=str(t.id),
-                name=t.name,
-                logo_url=t.logo_url,
-                city=t.city,
-                home_ground=t.home_ground,
-                description=t.description,
-                preferred_formats=list(t.preferred_formats or []),
-                current_player_count=t.current_player_count or 0,
-                max_players=t.max_players or 15,
-                captain_name=captain.full_name if captain else None,
-                captain_id=str(t.captain_id) if t.captain_id else None,
-            )
+    after = decode_cursor(cursor)
+    if after:
+        q = q.where(tuple_(Team.created_at, Team.id) < after)
+    else:
+        q = q.offset(skip)
+    rows = (
+        await db.execute(q.order_by(Team.created_at.desc(), Team.id.desc()).limit(limit))
+    ).all()
+    headers = (
+        {NEXT_CURSOR_HEADER: encode_cursor(rows[-1].created_at, rows[-1].id)}
+        if len(rows) == limit else None
+    )
+    cards = [
+        DiscoverTeamCard.model_construct(
+            id=t.id,
+            name=t.name,
+            logo_url=t.logo_url,
+            city=t.city,
+            home_ground=t.home_ground,
+            description=t.description,
+            preferred_formats=t.preferred_formats or [],
+            current_player_count=t.current_player_count,
+            max_players=t.max_players,
+            captain_name=t.captain_name,
+            captain_id=t.captain_id,
+        )
+        for t in rows
+    ]
+    body = _team_cards.dump_json(cards)
+    with _discover_cache_lock:
+        _discover_cache[cache_key] = (body, headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def _past_tournaments(user_id: UUID, db: AsyncSession) -> List[dict]:
+    """Load a player's past tournaments for the profile response."""
+    # Get past tournaments in one join, reading only the columns the
+    # profile shows rather than whole Tournament entities
+    past_tournaments = await db.execute(
+        select(
+            Tournament.id,
+            Tournament.name,
+            Tournament.format,
+            PlayerTournament.placement,
+            Tournament.start_date,
         )
-    return result
+        .join(Tournament, Tournament.id == PlayerTournament.tournament_id)
+        .where(PlayerTournament.player_id == user_id)
+    )
+    
+    return [
+        {
+            "id": t.id,
+            "name": t.name,
+            "format": t.format,
+            "placement": t.placement,
+            "date": t.start_date
+        }
+        for t in past_tournaments
+    ]
+
+
+def _build_profile(user: User, tournaments: List[dict]) -> Response:
+    """Build a player's profile response from the user row and tournaments.
+    
+    The data comes straight from the database, so the model is built with
+    model_construct and serialized directly instead of being re-validated.
+    """
+    profile = PlayerProfileResponse.model_construct(**{
+        "id": user.id,
+        "full_name": user.full_name,
+        "email": user.email,
+        "avatar_url": user.avatar_url,
+        "city": user.city,
+        "playing_role": user.playing_role,
+        "batting_style": user.batting_style,
+        "bowling_style": user.bowling_style,
+        "experience_years": user.experience_years,
+        "preferred_formats": user.preferred_formats or [],
+        "is_available": user.is_available,
+        "past_tournaments": tournaments
+    })
+    return Response(profile.model_dump_json(), media_type="application/json")
 
 
 @router.get("/me/profile", response_model=PlayerProfileResponse)
-def get_player_profile(
+async def get_player_profile(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current player's full profile including past tournaments"""
-    # Get past tournaments
-    past_tournaments = db.query(PlayerTournament).filter(
-        PlayerTournament.player_id == current_user.id
-    ).all()
-    
-    tournament_data = []
-    for pt in past_tournaments:
-        tournament = db.query(Tournament).filter(Tournament.id == pt.tournament_id).first()
-        if tournament:
-            tournament_data.append({
-                "id": str(tournament.id),
-                "name": tournament.name,
-                "format": tournament.format,
-                "placement": pt.placement,
-                "date": tournament.start_date.isoformat()
-            })
-    
-    profile_data = {
-        "id": current_user.id,
-        "full_name": current_user.full_name,
-        "email": current_user.email,
-        "avatar_url": current_user.avatar_url,
-        "city": current_user.city,
-        "playing_role": current_user.playing_role,
-        "batting_style": current_user.batting_style,
-        "bowling_style": current_user.bowling_style,
-        "experience_years": current_user.experience_years,
-        "preferred_formats": current_user.preferred_formats or [],
-        "is_available": current_user.is_available,
-        "past_tournaments": tournament_data
-    }
-    
-    return profile_data
+    return _build_profile(current_user, await _past_tournaments(current_user.id, db))
 
 
 @router.put("/me/profile", response_model=PlayerProfileResponse)
-def update_player_profile(
+async def update_player_profile(
     profile_update: PlayerProfileUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    include_tournaments: bool = Query(False, description="Also return past tournaments"),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Update current player's profile"""
-    # Update the user fields
-    for field, value in profile_update.model_dump(exclude_unset=True).items():
-        setattr(current_user, field, value)
+    """Update current player's profile
     
-    db.commit()
-    db.refresh(current_user)
-    
-    # Return the full profile
-    return get_player_profile(current_user, db)
+    Past tournaments are unaffected by the update, so they are only loaded
+    when ``include_tournaments`` is set.
+    """
+    # Update and read back the row in one round-trip
+    changes = sent_fields(profile_update)
+    if changes:
+        stmt = update(User).where(User.id == current_user.id).values(**changes).returning(User)
+        user = (await db.execute(stmt)).scalar_one_or_none()
+    else:
+        user = await db.get(User, current_user.id)
+    # The cached principal can outlive a deleted user row by a few seconds
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    await db.commit()
+    
+    tournaments = await _past_tournaments(user.id, db) if include_tournaments else []
+    return _build_profile(user, tournaments)
 
 
 @router.post("/me/availability", response_model=dict)
-def toggle_availability(
+async def toggle_availability(
     availability: AvailabilityToggle,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Toggle player's general availability status"""
-    current_user.is_available = availability.is_available
-    db.commit()
+    # Write the flag directly; the user row doesn't need to be loaded first
+    await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(is_available=availability.is_available)
+    )
+    await db.commit()
     
     return {
         "message": f"Availability set to {'available' if availability.is_available else 'unavailable'}",
-        "is_available": current_user.is_available
+        "is_available": availability.is_available
     }
 
 
 @router.get("/me/availability/weekly", response_model=dict)
-def get_weekly_availability(
+async def get_weekly_availability(
     current_user: User = Depends(get_current_user),
 ):
     """Get the player's weekly availability schedule."""
@@ -183,193 +314,209 @@ def get_weekly_availability(
 
 
 @router.put("/me/availability/weekly", response_model=dict)
-def set_weekly_availability(
+async def set_weekly_availability(
     payload: WeeklyAvailabilityUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Save the player's weekly availability schedule."""
-    current_user.weekly_availability = payload.schedule
     # If any slots are set, mark the player as generally available
     has_slots = any(len(slots) > 0 for slots in payload.schedule.values())
-    current_user.is_available = has_slots
-    db.commit()
+    # Both columns in one UPDATE; the user row doesn't need to be loaded first
+    await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(weekly_availability=payload.schedule, is_available=has_slots)
+    )
+    await db.commit()
     return {
         "message": "Weekly availability updated",
-        "schedule": current_user.weekly_availability,
-        "is_available": current_user.is_available,
+        "schedule": payload.schedule,
+        "is_available": has_slots,
     }
 
 
-@router.get("/me/availability", response_model=List[PlayerAvailabilityResponse])
-def get_my_availability(
-    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
-    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get(
+    "/me/availability/calendar",
+    response_model=Union[List[PlayerAvailabilityResponse], AvailabilityCalendarResponse],
+)
+async def get_my_availability(
+    start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
+    include_weekly: bool = Query(False, description="Also return the weekly schedule"),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get player's availability calendar for date range"""
-    from datetime import datetime
+    """Get player's availability calendar for date range
     
-    start = datetime.strptime(start_date, "%Y-%m-%d").date()
-    end = datetime.strptime(end_date, "%Y-%m-%d").date()
-    
-    availabilities = db.query(PlayerAvailability).filter(
-        and_(
-            PlayerAvailability.player_id == current_user.id,
-            PlayerAvailability.date >= start,
-            PlayerAvailability.date <= end
+    With ``include_weekly`` the weekly schedule comes back alongside the
+    dates as ``{weekly, dates}``, so the availability screen needs one call.
+    """
+    # Half-open [start, end + 1 day) range scan on unique_player_date
+    availabilities = await db.scalars(
+        select(PlayerAvailability).where(
+            and_(
+                PlayerAvailability.player_id == current_user.id,
+                PlayerAvailability.date >= start_date,
+                PlayerAvailability.date < end_date + timedelta(days=1)
+            )
         )
-    ).all()
+    )
+    dates = availabilities.all()
     
-    return availabilities
+    if not include_weekly:
+        return dates
+    weekly = await db.scalar(
+        select(User.weekly_availability).where(User.id == current_user.id)
+    )
+    return AvailabilityCalendarResponse(weekly=weekly or {}, dates=dates)
 
 
 @router.post("/me/availability/calendar", response_model=PlayerAvailabilityResponse)
-def set_date_availability(
+async def set_date_availability(
     availability: PlayerAvailabilityCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Set availability for a specific date"""
-    # Check if already exists
-    existing = db.query(PlayerAvailability).filter(
-        and_(
-            PlayerAvailability.player_id == current_user.id,
-            PlayerAvailability.date == availability.date
-        )
-    ).first()
-    
-    if existing:
-        existing.is_available = availability.is_available
-        existing.notes = availability.notes
-        existing.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(existing)
-        return existing
-    
-    new_availability = PlayerAvailability(
+    # Insert or overwrite the day's entry in one atomic statement
+    stmt = insert(PlayerAvailability).values(
         player_id=current_user.id,
         date=availability.date,
         is_available=availability.is_available,
         notes=availability.notes
     )
-    db.add(new_availability)
-    db.commit()
-    db.refresh(new_availability)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["player_id", "date"],
+        set_={
+            "is_available": stmt.excluded.is_available,
+            "notes": stmt.excluded.notes,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ).returning(PlayerAvailability)
+    
+    entry = await db.scalar(stmt)
+    await db.commit()
     
-    return new_availability
+    return entry
 
 
 @router.get("/tournaments/search", response_model=List[TournamentResponse])
-def search_tournaments(
+async def search_tournaments(
     city: str = Query(None, description="Filter by city"),
     format: str = Query(None, description="Filter by format (T20, ODI, etc.)"),
     upcoming: bool = Query(True, description="Show only upcoming tournaments"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: CurrentPrincipal = Depends(get_current_principal)
 ):
     """Search for tournaments"""
-    query = db.query(Tournament).filter(Tournament.is_published == True)
+    query = select(*Tournament.__table__.c).where(Tournament.is_published == True)
     
     if upcoming:
-        query = query.filter(Tournament.start_date >= datetime.utcnow().date())
+        # Bound as a literal date so the planner can range-scan the index
+        today = datetime.utcnow().date()
+        query = query.where(Tournament.start_date >= today)
     
     if city:
-        query = query.filter(Tournament.city.ilike(f"%{city}%"))
+        query = query.where(Tournament.city.ilike(f"%{city}%"))
     
     if format:
-        query = query.filter(Tournament.format == format)
+        query = query.where(Tournament.format == format)
     
-    tournaments = query.order_by(Tournament.start_date).all()
-    return tournaments
+    return stream_json_array(
+        query.order_by(Tournament.start_date, Tournament.id).offset(skip).limit(limit),
+        TournamentResponse,
+    )
 
 
 @router.get("/teams/search", response_model=List[TeamResponse])
-def search_teams(
+async def search_teams(
     city: str = Query(None, description="Filter by city"),
     format: str = Query(None, description="Filter by preferred format"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: CurrentPrincipal = Depends(get_current_principal)
 ):
     """Search for teams"""
-    query = db.query(Team).filter(Team.is_active == True)
+    query = select(*Team.__table__.c).where(Team.is_active == True)
     
     if city:
-        query = query.filter(Team.city.ilike(f"%{city}%"))
+        query = query.where(Team.city.ilike(f"%{city}%"))
     
     if format:
-        query = query.filter(Team.preferred_formats.contains([format]))
+        query = query.where(Team.preferred_formats.contains([format]))
     
-    teams = query.all()
-    return teams
+    return stream_json_array(
+        query.order_by(Team.created_at.desc(), Team.id.desc()).offset(skip).limit(limit),
+        TeamResponse,
+    )
 
 
 @router.post("/teams/{team_id}/apply", response_model=TeamApplicationResponse)
-def apply_to_team(
+async def apply_to_team(
     team_id: UUID,
     application: TeamApplicationCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Apply to join a team"""
-    # Verify team exists
-    team = db.query(Team).filter(Team.id == team_id).first()
-    if not team:
+    if not await db.scalar(select(exists().where(Team.id == team_id))):
         raise HTTPException(status_code=404, detail="Team not found")
     
-    # Check if already applied
-    existing = db.query(TeamApplication).filter(
-        and_(
-            TeamApplication.team_id == team_id,
-            TeamApplication.player_id == current_user.id,
-            TeamApplication.status == ApplicationStatus.PENDING
-        )
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="You have already applied to this team")
-    
-    new_application = TeamApplication(
+    # Insert unless an application is already pending (uq_team_applications_pending);
+    # concurrent applies can't both get in, and RETURNING comes back empty for the loser
+    stmt = insert(TeamApplication).values(
         team_id=team_id,
         player_id=current_user.id,
         message=application.message,
         status=ApplicationStatus.PENDING
-    )
-    
-    db.add(new_application)
-    db.commit()
-    db.refresh(new_application)
+    ).on_conflict_do_nothing(
+        index_elements=["team_id", "player_id"],
+        # Inlined: partial-index inference can't see through a bound parameter
+        index_where=text("status = 'PENDING'"),
+    ).returning(TeamApplication)
+    new_application = await db.scalar(stmt)
+    
+    if new_application is None:
+        raise HTTPException(status_code=400, detail="You have already applied to this team")
     
+    await db.commit()
     return new_application
 
 
 @router.get("/me/applications", response_model=List[TeamApplicationResponse])
-def get_my_applications(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_my_applications(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
 ):
     """Get all team applications by the current player"""
-    applications = db.query(TeamApplication).filter(
-        TeamApplication.player_id == current_user.id
-    ).order_by(TeamApplication.created_at.desc()).all()
-    
-    return applications
+    return stream_json_array(
+        select(*TeamApplication.__table__.c)
+        .where(TeamApplication.player_id == current_user.id)
+        .order_by(TeamApplication.created_at.desc(), TeamApplication.id.desc())
+        .offset(skip)
+        .limit(limit),
+        TeamApplicationResponse,
+    )
 
 
 @router.delete("/applications/{application_id}")
-def withdraw_application(
+async def withdraw_application(
     application_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Withdraw a team application"""
-    application = db.query(TeamApplication).filter(
-        and_(
-            TeamApplication.id == application_id,
-            TeamApplication.player_id == current_user.id
+    application = await db.scalar(
+        select(TeamApplication).where(
+            and_(
+                TeamApplication.id == application_id,
+                TeamApplication.player_id == current_user.id
+            )
         )
-    ).first()
+    )
     
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
@@ -378,42 +525,70 @@ def withdraw_application(
         raise HTTPException(status_code=400, detail="Can only withdraw pending applications")
     
     application.status = ApplicationStatus.WITHDRAWN
-    db.commit()
+    await db.commit()
     
     return {"message": "Application withdrawn successfully"}
 
 
 @router.get("/me/invitations", response_model=List[TeamInvitationResponse])
-def get_my_invitations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_my_invitations(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all team invitations for the current player"""
-    invitations = db.query(TeamInvitation).filter(
-        and_(
+    # Mark this player's lapsed invitations EXPIRED so they drop out of the
+    # pending set (and the partial index) instead of piling up
+    expired = await db.execute(
+        update(TeamInvitation)
+        .where(
             TeamInvitation.player_id == current_user.id,
             TeamInvitation.status == InvitationStatus.PENDING,
-            TeamInvitation.expires_at > datetime.utcnow()
+            TeamInvitation.expires_at <= DB_UTCNOW,
         )
-    ).order_by(TeamInvitation.created_at.desc()).all()
+        .values(status=InvitationStatus.EXPIRED)
+        .execution_options(synchronize_session=False)
+    )
     
-    return invitations
+    # The stream reads on its own session, so commit the expiry first
+    if expired.rowcount:
+        await db.commit()
+    
+    # Served in order by ix_team_invitations_pending_player_created; now()
+    # is stable within the statement, so the expiry check is evaluated once
+    return stream_json_array(
+        select(*TeamInvitation.__table__.c)
+        .where(
+            and_(
+                TeamInvitation.player_id == current_user.id,
+                TeamInvitation.status == InvitationStatus.PENDING,
+                TeamInvitation.expires_at > DB_UTCNOW
+            )
+        )
+        .order_by(TeamInvitation.created_at.desc(), TeamInvitation.id.desc())
+        .offset(skip)
+        .limit(limit),
+        TeamInvitationResponse,
+    )
 
 
 @router.put("/invitations/{invitation_id}", response_model=TeamInvitationResponse)
-def respond_to_invitation(
+async def respond_to_invitation(
     invitation_id: UUID,
     response: TeamInvitationUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Accept or decline a team invitation"""
-    invitation = db.query(TeamInvitation).filter(
-        and_(
-            TeamInvitation.id == invitation_id,
-            TeamInvitation.player_id == current_user.id
+    invitation = await db.scalar(
+        select(TeamInvitation).where(
+            and_(
+                TeamInvitation.id == invitation_id,
+                TeamInvitation.player_id == current_user.id
+            )
         )
-    ).first()
+    )
     
     if not invitation:
         raise HTTPException(status_code=404, detail="Invitation not found")
@@ -423,12 +598,11 @@ def respond_to_invitation(
     
     if invitation.expires_at < datetime.utcnow():
         invitation.status = InvitationStatus.EXPIRED
-        db.commit()
+        await db.commit()
         raise HTTPException(status_code=400, detail="Invitation has expired")
     
     invitation.status = response.status
-    db.commit()
-    db.refresh(invitation)
+    await db.commit()
     
     return invitation
 
@@ -436,95 +610,113 @@ def respond_to_invitation(
 # ── Swipe-right endpoints (mutual match logic) ────────────────────────────────
 
 @router.post("/teams/{team_id}/swipe-right")
-def player_swipe_right_on_team(
+async def player_swipe_right_on_team(
     team_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Player swipes right on a team.
     Records a TeamApplication. If the team's captain has already invited this
     player (i.e. swiped right on them), returns matched=True.
     """
-    team = db.query(Team).filter(Team.id == team_id).first()
-    if not team:
-        raise HTTPException(status_code=404, detail="Team not found")
-
-    # Idempotent: don't create a second application
-    existing = db.query(TeamApplication).filter(
-        TeamApplication.team_id == team_id,
-        TeamApplication.player_id == current_user.id,
-    ).first()
-    if not existing:
-        new_app = TeamApplication(
-            team_id=team_id,
-            player_id=current_user.id,
-            status=ApplicationStatus.PENDING,
+    # One statement: look up the team, record the application unless the
+    # player already has one, and check for a pending invitation
+    team = select(Team.id, Team.name, Team.captain_id).where(Team.id == team_id).cte("team")
+    applied = (
+        insert(TeamApplication)
+        .from_select(
+            ["team_id", "player_id", "status"],
+            select(
+                team.c.id,
+                literal(current_user.id, TeamApplication.player_id.type),
+                literal(ApplicationStatus.PENDING, TeamApplication.status.type),
+            ).where(
+                ~exists().where(
+                    TeamApplication.team_id == team.c.id,
+                    TeamApplication.player_id == current_user.id,
+                )
+            ),
         )
-        db.add(new_app)
-        db.commit()
-
-    # Check if the captain has already swiped right on this player
-    captain_liked = db.query(TeamInvitation).filter(
-        TeamInvitation.team_id == team_id,
+        .on_conflict_do_nothing()
+        .returning(TeamApplication.id)
+        .cte("applied")
+    )
+    captain_liked = exists().where(
+        TeamInvitation.team_id == team.c.id,
         TeamInvitation.player_id == current_user.id,
         TeamInvitation.status == InvitationStatus.PENDING,
-    ).first()
+    )
+    row = (
+        await db.execute(
+            select(team.c.name, team.c.captain_id, captain_liked.label("matched")).add_cte(applied)
+        )
+    ).one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Team not found")
+    await db.commit()
 
     return {
-        "matched": captain_liked is not None,
-        "team_id": str(team_id),
-        "captain_id": str(team.captain_id) if team.captain_id else None,
-        "team_name": team.name,
+        "matched": row.matched,
+        "team_id": team_id,
+        "captain_id": row.captain_id,
+        "team_name": row.name,
     }
 
 
 @router.post("/players/{player_id}/swipe-right")
-def captain_swipe_right_on_player(
+async def captain_swipe_right_on_player(
     player_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Captain swipes right on a player.
     Records a TeamInvitation for the captain's team. If the player has already
     applied to this team (i.e. swiped right on it), returns matched=True.
     """
-    # Captain must have a team
-    team = db.query(Team).filter(Team.captain_id == current_user.id).first()
-    if not team:
-        raise HTTPException(status_code=400, detail="You must have a team to invite players")
-
-    player = db.query(User).filter(User.id == player_id).first()
-    if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
-
-    # Idempotent: don't create a duplicate invitation
-    existing = db.query(TeamInvitation).filter(
-        TeamInvitation.team_id == team.id,
-        TeamInvitation.player_id == player_id,
-        TeamInvitation.status == InvitationStatus.PENDING,
-    ).first()
-    if not existing:
-        new_inv = TeamInvitation(
-            team_id=team.id,
-            player_id=player_id,
-            invited_by=current_user.id,
-            status=InvitationStatus.PENDING,
-            expires_at=datetime.utcnow() + timedelta(days=30),
+    # One statement: find the captain's team and the player, record the
+    # invitation unless one is already pending, and check for an application
+    team = select(Team.id).where(Team.captain_id == current_user.id).limit(1).cte("team")
+    player = select(User.id, User.full_name).where(User.id == player_id).cte("player")
+    invited = (
+        insert(TeamInvitation)
+        .from_select(
+            ["team_id", "player_id", "invited_by", "status", "expires_at"],
+            select(
+                team.c.id,
+                player.c.id,
+                literal(current_user.id, TeamInvitation.invited_by.type),
+                literal(InvitationStatus.PENDING, TeamInvitation.status.type),
+                # Expiry on the database clock, like the DB_UTCNOW checks that read it
+                DB_UTCNOW + timedelta(days=30),
+            ).select_from(team.join(player, true())),
         )
-        db.add(new_inv)
-        db.commit()
-
-    # Check if the player has already applied to this team
-    player_liked = db.query(TeamApplication).filter(
-        TeamApplication.team_id == team.id,
+        .on_conflict_do_nothing()
+        .returning(TeamInvitation.id)
+        .cte("invited")
+    )
+    player_liked = exists().where(
+        TeamApplication.team_id == team.c.id,
         TeamApplication.player_id == player_id,
         TeamApplication.status == ApplicationStatus.PENDING,
-    ).first()
+    )
+    row = (
+        await db.execute(
+            select(player.c.id, player.c.full_name, player_liked.label("matched"))
+            .select_from(team.outerjoin(player, true()))
+            .add_cte(invited)
+        )
+    ).one_or_none()
+    # Captain must have a team
+    if not row:
+        raise HTTPException(status_code=400, detail="You must have a team to invite players")
+    if row.id is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    await db.commit()
 
     return {
-        "matched": player_liked is not None,
-        "player_id": str(player_id),
-        "player_name": player.full_name,
+        "matched": row.matched,
+        "player_id": player_id,
+        "player_name": row.full_name,
     }
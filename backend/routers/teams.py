@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import delete, exists, func, literal, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
 from typing import List
 from uuid import UUID
-from datetime import datetime, timedelta
+from datetime import timedelta
 from pydantic import ValidationError
 
-from database import get_db
-from models import Team, PlayerRequirement, TeamTournamentParticipation, User, TeamApplication, TeamInvitation, InvitationStatus, ApplicationStatus
+from database import get_async_db
+from streaming import stream_json_array
+from models import DB_UTCNOW, Team, PlayerRequirement, TeamTournamentParticipation, User, TeamApplication, TeamInvitation, InvitationStatus, ApplicationStatus, ROLE_CAPTAIN, ROLE_PLAYER
 from schemas_team_recruitment import (
     PlayerRequirementCreate, 
     PlayerRequirementUpdate, 
@@ -17,12 +21,42 @@ from schemas_team_recruitment import (
     TeamProfileExtended,
     MarkSquadFullRequest
 )
-from schemas import TeamCreate, TeamUpdate, TeamResponse, TeamApplicationResponse, TeamInvitationCreate, TeamInvitationResponse
-from auth import get_current_user
+from schemas import TeamCreate, TeamUpdate, TeamResponse, TeamApplicationResponse, TeamInvitationCreate, TeamInvitationBulkCreate, TeamInvitationResponse, sent_fields
+from etag import weak_etag, not_modified, set_etag
+from auth import get_current_principal, CurrentPrincipal
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
 
+async def _not_captain_error(db: AsyncSession, row_exists, not_found: str, forbidden: str) -> HTTPException:
+    """Explain why a captain-scoped UPDATE matched nothing: no such row (404) or not the captain (403)"""
+    if await db.scalar(select(row_exists)):
+        return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=forbidden)
+    return HTTPException(status_code=404, detail=not_found)
+
+
+async def _team_auth_row(db: AsyncSession, team_id: UUID):
+    """Just the columns the invite checks read, not the whole team row"""
+    result = await db.execute(
+        select(Team.captain_id, Team.is_squad_full).where(Team.id == team_id)
+    )
+    return result.one_or_none()
+
+
+def _child_rows_version(model, team_id):
+    """Latest updated_at and row count of a team's child rows; the count catches deletes"""
+    return (
+        select(func.max(model.updated_at), func.count())
+        .where(model.team_id == team_id)
+        .subquery()
+    )
+
+
+def _captains_team(team_id, user_id):
+    """EXISTS clause: ``team_id`` belongs to a team captained by ``user_id``"""
+    return exists().where(Team.id == team_id, Team.captain_id == user_id)
+
+
 def get_team_dict(team: Team) -> dict:
     """Helper function to convert Team model to dict for response"""
     return {
@@ -45,11 +79,11 @@ def get_team_dict(team: Team) -> dict:
 @router.post("", response_model=TeamResponse, status_code=status.HTTP_201_CREATED)
 async def create_team(
     team: TeamCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new team (Captain only)"""
-    if "captain" not in current_user.roles:
+    if not current_user.has_role(ROLE_CAPTAIN):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only captains can create teams"
@@ -60,18 +94,21 @@ async def create_team(
         captain_id=current_user.id
     )
     db.add(db_team)
-    db.commit()
-    db.refresh(db_team)
+    await db.commit()
     return db_team
 
 
 @router.get("/my-teams", response_model=List[TeamResponse])
 async def get_my_teams(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all teams where the current user is the captain"""
-    teams = db.query(Team).filter(Team.captain_id == current_user.id).all()
+    teams = (
+        await db.scalars(
+            select(Team).options(raiseload("*")).where(Team.captain_id == current_user.id)
+        )
+    ).all()
     
     # Convert to dict list
     return [get_team_dict(team) for team in teams]
@@ -80,18 +117,18 @@ async def get_my_teams(
 @router.put("/me", response_model=TeamResponse)
 async def update_my_team(
     team_update: TeamUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update the current user's team (Captain only). Creates a team if one doesn't exist."""
-    if "captain" not in current_user.roles:
+    if not current_user.has_role(ROLE_CAPTAIN):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only captains can update teams"
         )
     
     # Get the user's first team (assuming one team per captain for now)
-    db_team = db.query(Team).filter(Team.captain_id == current_user.id).first()
+    db_team = await db.scalar(select(Team).where(Team.captain_id == current_user.id).limit(1))
     
     # If no team exists, create one
     if not db_team:
@@ -100,14 +137,13 @@ async def update_my_team(
             captain_id=current_user.id
         )
         db.add(db_team)
-        db.flush()  # Get the ID without committing yet
+        await db.flush()  # Get the ID without committing yet
     
     # Update team fields
-    for field, value in team_update.model_dump(exclude_unset=True).items():
+    for field, value in sent_fields(team_update).items():
         setattr(db_team, field, value)
     
-    db.commit()
-    db.refresh(db_team)
+    await db.commit()
     
     # Return team as dict
     return get_team_dict(db_team)
@@ -116,55 +152,73 @@ async def update_my_team(
 @router.get("/{team_id}", response_model=TeamProfileExtended)
 async def get_team_profile(
     team_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentPrincipal = Depends(get_current_principal)
 ):
-    """Get detailed team profile with requirements and tournament history"""
-    team = db.query(Team).filter(Team.id == team_id).first()
-    if not team:
+    """Get detailed team profile with requirements and tournament history.
+    
+    The ETag covers the team row and both collections, read in one small
+    aggregate query; a matching If-None-Match skips loading the profile.
+    """
+    requirements = _child_rows_version(PlayerRequirement, team_id)
+    participations = _child_rows_version(TeamTournamentParticipation, team_id)
+    version = (
+        await db.execute(
+            select(Team.updated_at, *requirements.c, *participations.c)
+            .where(Team.id == team_id)
+        )
+    ).one_or_none()
+    if version is None:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    # Get player requirements
-    requirements = db.query(PlayerRequirement).filter(
-        PlayerRequirement.team_id == team_id,
-        PlayerRequirement.is_active == True
-    ).all()
-    
-    # Get tournament participations
-    participations = db.query(TeamTournamentParticipation).filter(
-        TeamTournamentParticipation.team_id == team_id
-    ).all()
+    etag = weak_etag(team_id, *version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+    
+    # The team plus one IN query per collection; nothing else may lazy-load
+    team = await db.scalar(
+        select(Team)
+        .where(Team.id == team_id)
+        .options(
+            selectinload(Team.player_requirements.and_(PlayerRequirement.is_active == True)),
+            selectinload(Team.tournament_participations),
+            raiseload("*"),
+        )
+    )
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
     
-    return {
-        **team.__dict__,
-        "player_requirements": requirements,
-        "tournament_participations": participations
-    }
+    return team
 
 
 @router.put("/{team_id}", response_model=TeamResponse)
 async def update_team(
     team_id: UUID,
     team_update: TeamUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update team details (Captain only)"""
-    db_team = db.query(Team).filter(Team.id == team_id).first()
-    if not db_team:
-        raise HTTPException(status_code=404, detail="Team not found")
-    
-    if db_team.captain_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only the team captain can update team details"
+    # Authorize and update in one statement; updated_at's onupdate keeps
+    # the SET clause non-empty even when no fields were sent
+    stmt = (
+        update(Team)
+        .where(Team.id == team_id, Team.captain_id == current_user.id)
+        .values(**sent_fields(team_update))
+        .returning(Team)
+    )
+    db_team = (await db.execute(stmt)).scalar_one_or_none()
+    if db_team is None:
+        raise await _not_captain_error(
+            db, exists().where(Team.id == team_id),
+            "Team not found", "Only the team captain can update team details"
         )
     
-    for field, value in team_update.model_dump(exclude_unset=True).items():
-        setattr(db_team, field, value)
-    
-    db.commit()
-    db.refresh(db_team)
+    await db.commit()
     return db_team
 
 
@@ -173,15 +227,15 @@ async def update_team(
 async def create_player_requirement(
     team_id: UUID,
     requirement: PlayerRequirementCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Post a player requirement (Captain only)"""
-    team = db.query(Team).filter(Team.id == team_id).first()
-    if not team:
+    captain_id = await db.scalar(select(Team.captain_id).where(Team.id == team_id))
+    if captain_id is None:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    if team.captain_id != current_user.id:
+    if captain_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the team captain can post requirements"
@@ -192,8 +246,7 @@ async def create_player_requirement(
         team_id=team_id
     )
     db.add(db_requirement)
-    db.commit()
-    db.refresh(db_requirement)
+    await db.commit()
     return db_requirement
 
 
@@ -201,64 +254,67 @@ async def create_player_requirement(
 async def get_team_requirements(
     team_id: UUID,
     active_only: bool = True,
-    db: Session = Depends(get_db)
 ):
     """Get all player requirements for a team"""
-    query = db.query(PlayerRequirement).filter(PlayerRequirement.team_id == team_id)
+    query = (
+        select(*PlayerRequirement.__table__.c)
+        .where(PlayerRequirement.team_id == team_id)
+    )
     
     if active_only:
-        query = query.filter(PlayerRequirement.is_active == True)
+        query = query.where(PlayerRequirement.is_active == True)
     
-    return query.all()
+    return stream_json_array(query, PlayerRequirementResponse)
 
 
 @router.put("/requirements/{requirement_id}", response_model=PlayerRequirementResponse)
 async def update_player_requirement(
     requirement_id: UUID,
     requirement_update: PlayerRequirementUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a player requirement (Captain only)"""
-    db_requirement = db.query(PlayerRequirement).filter(PlayerRequirement.id == requirement_id).first()
-    if not db_requirement:
-        raise HTTPException(status_code=404, detail="Requirement not found")
-    
-    team = db.query(Team).filter(Team.id == db_requirement.team_id).first()
-    if team.captain_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only the team captain can update requirements"
+    stmt = (
+        update(PlayerRequirement)
+        .where(
+            PlayerRequirement.id == requirement_id,
+            _captains_team(PlayerRequirement.team_id, current_user.id),
+        )
+        .values(**sent_fields(requirement_update))
+        .returning(PlayerRequirement)
+    )
+    db_requirement = (await db.execute(stmt)).scalar_one_or_none()
+    if db_requirement is None:
+        raise await _not_captain_error(
+            db, exists().where(PlayerRequirement.id == requirement_id),
+            "Requirement not found", "Only the team captain can update requirements"
         )
     
-    for field, value in requirement_update.model_dump(exclude_unset=True).items():
-        setattr(db_requirement, field, value)
-    
-    db.commit()
-    db.refresh(db_requirement)
+    await db.commit()
     return db_requirement
 
 
 @router.delete("/requirements/{requirement_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_player_requirement(
     requirement_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a player requirement (Captain only)"""
-    db_requirement = db.query(PlayerRequirement).filter(PlayerRequirement.id == requirement_id).first()
-    if not db_requirement:
-        raise HTTPException(status_code=404, detail="Requirement not found")
-    
-    team = db.query(Team).filter(Team.id == db_requirement.team_id).first()
-    if team.captain_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only the team captain can delete requirements"
+    result = await db.execute(
+        delete(PlayerRequirement).where(
+            PlayerRequirement.id == requirement_id,
+            _captains_team(PlayerRequirement.team_id, current_user.id),
+        )
+    )
+    if result.rowcount == 0:
+        raise await _not_captain_error(
+            db, exists().where(PlayerRequirement.id == requirement_id),
+            "Requirement not found", "Only the team captain can delete requirements"
         )
     
-    db.delete(db_requirement)
-    db.commit()
+    await db.commit()
 
 
 # Tournament Participation
@@ -266,48 +322,47 @@ async def delete_player_requirement(
 async def register_team_for_tournament(
     team_id: UUID,
     participation: TeamTournamentParticipationCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register team for a tournament (Captain only)"""
-    team = db.query(Team).filter(Team.id == team_id).first()
-    if not team:
+    captain_id = await db.scalar(select(Team.captain_id).where(Team.id == team_id))
+    if captain_id is None:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    if team.captain_id != current_user.id:
+    if captain_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the team captain can register for tournaments"
         )
     
-    # Check if already registered
-    existing = db.query(TeamTournamentParticipation).filter(
-        TeamTournamentParticipation.team_id == team_id,
-        TeamTournamentParticipation.tournament_id == participation.tournament_id
-    ).first()
+    # Insert unless already registered; the unique constraint makes this
+    # atomic, and RETURNING comes back empty on a duplicate
+    stmt = insert(TeamTournamentParticipation).values(
+        team_id=team_id,
+        tournament_id=participation.tournament_id
+    ).on_conflict_do_nothing(
+        index_elements=["team_id", "tournament_id"]
+    ).returning(TeamTournamentParticipation)
+    db_participation = await db.scalar(stmt)
     
-    if existing:
+    if db_participation is None:
         raise HTTPException(status_code=400, detail="Team already registered for this tournament")
     
-    db_participation = TeamTournamentParticipation(
-        team_id=team_id,
-        tournament_id=participation.tournament_id
-    )
-    db.add(db_participation)
-    db.commit()
-    db.refresh(db_participation)
+    await db.commit()
     return db_participation
 
 
 @router.get("/{team_id}/tournaments", response_model=List[TeamTournamentParticipationResponse])
 async def get_team_tournaments(
     team_id: UUID,
-    db: Session = Depends(get_db)
 ):
     """Get all tournaments a team has participated in"""
-    return db.query(TeamTournamentParticipation).filter(
-        TeamTournamentParticipation.team_id == team_id
-    ).all()
+    return stream_json_array(
+        select(*TeamTournamentParticipation.__table__.c)
+        .where(TeamTournamentParticipation.team_id == team_id),
+        TeamTournamentParticipationResponse,
+    )
 
 
 # Squad Management
@@ -315,23 +370,24 @@ async def get_team_tournaments(
 async def mark_squad_full(
     team_id: UUID,
     request: MarkSquadFullRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark team squad as full or available (Captain only)"""
-    team = db.query(Team).filter(Team.id == team_id).first()
-    if not team:
-        raise HTTPException(status_code=404, detail="Team not found")
-    
-    if team.captain_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only the team captain can mark squad status"
+    stmt = (
+        update(Team)
+        .where(Team.id == team_id, Team.captain_id == current_user.id)
+        .values(is_squad_full=request.is_squad_full)
+        .returning(Team)
+    )
+    team = (await db.execute(stmt)).scalar_one_or_none()
+    if team is None:
+        raise await _not_captain_error(
+            db, exists().where(Team.id == team_id),
+            "Team not found", "Only the team captain can mark squad status"
         )
     
-    team.is_squad_full = request.is_squad_full
-    db.commit()
-    db.refresh(team)
+    await db.commit()
     return team
 
 
@@ -340,11 +396,11 @@ async def mark_squad_full(
 async def invite_player_to_team(
     team_id: UUID,
     invitation: TeamInvitationCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Invite a player to join the team (Captain only)"""
-    team = db.query(Team).filter(Team.id == team_id).first()
+    team = await _team_auth_row(db, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
@@ -357,107 +413,202 @@ async def invite_player_to_team(
     if team.is_squad_full:
         raise HTTPException(status_code=400, detail="Team squad is full")
     
-    # Check if player exists
-    player = db.query(User).filter(User.id == invitation.player_id).first()
-    if not player or "player" not in player.roles:
+    # Check the player exists with a role-bit test in SQL, not a full row load
+    is_player = await db.scalar(
+        select(exists().where(User.id == invitation.player_id, User.has_role(ROLE_PLAYER)))
+    )
+    if not is_player:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    # Check for existing pending invitation
-    existing = db.query(TeamInvitation).filter(
-        TeamInvitation.team_id == team_id,
-        TeamInvitation.player_id == invitation.player_id,
-        TeamInvitation.status == InvitationStatus.PENDING
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="Player already has a pending invitation")
-    
-    db_invitation = TeamInvitation(
+    # Insert unless an invitation is already pending (uq_team_invitations_pending)
+    stmt = insert(TeamInvitation).values(
         team_id=team_id,
         player_id=invitation.player_id,
         invited_by=current_user.id,
         message=invitation.message,
-        expires_at=datetime.utcnow() + timedelta(days=7)
-    )
-    db.add(db_invitation)
-    db.commit()
-    db.refresh(db_invitation)
+        expires_at=DB_UTCNOW + timedelta(days=7)
+    ).on_conflict_do_nothing(
+        index_elements=["team_id", "player_id"],
+        # Inlined: partial-index inference can't see through a bound parameter
+        index_where=text("status = 'PENDING'"),
+    ).returning(TeamInvitation)
+    db_invitation = await db.scalar(stmt)
+    
+    if db_invitation is None:
+        raise HTTPException(status_code=400, detail="Player already has a pending invitation")
+    
+    await db.commit()
     return db_invitation
 
 
+@router.post("/{team_id}/invite/bulk", response_model=List[TeamInvitationResponse], status_code=status.HTTP_201_CREATED)
+async def invite_players_to_team(
+    team_id: UUID,
+    invitations: TeamInvitationBulkCreate,
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Invite several players at once (Captain only).
+    
+    Ids that aren't players, or already have a pending invitation, are
+    skipped; only the invitations actually created are returned.
+    """
+    team = await _team_auth_row(db, team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    if team.captain_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the team captain can invite players"
+        )
+    
+    if team.is_squad_full:
+        raise HTTPException(status_code=400, detail="Team squad is full")
+    
+    # One INSERT ... SELECT over the invited players; the id is generated per
+    # row in SQL, since a Python default would be evaluated once per statement
+    stmt = insert(TeamInvitation).from_select(
+        ["id", "team_id", "player_id", "invited_by", "message", "status", "expires_at"],
+        select(
+            func.gen_random_uuid(),
+            literal(team_id, TeamInvitation.team_id.type),
+            User.id,
+            literal(current_user.id, TeamInvitation.invited_by.type),
+            literal(invitations.message, TeamInvitation.message.type),
+            literal(InvitationStatus.PENDING, TeamInvitation.status.type),
+            DB_UTCNOW + timedelta(days=7),
+        ).where(User.id.in_(set(invitations.player_ids)), User.has_role(ROLE_PLAYER)),
+    ).on_conflict_do_nothing(
+        index_elements=["team_id", "player_id"],
+        index_where=text("status = 'PENDING'"),
+    ).returning(TeamInvitation)
+    created = (await db.scalars(stmt)).all()
+    
+    await db.commit()
+    return created
+
+
 # Application Management
 @router.get("/{team_id}/applications", response_model=List[TeamApplicationResponse])
 async def get_team_applications(
     team_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all applications to the team (Captain only)"""
-    team = db.query(Team).filter(Team.id == team_id).first()
-    if not team:
+    captain_id = await db.scalar(select(Team.captain_id).where(Team.id == team_id))
+    if captain_id is None:
         raise HTTPException(status_code=404, detail="Team not found")
     
-    if team.captain_id != current_user.id:
+    if captain_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the team captain can view applications"
         )
     
-    return db.query(TeamApplication).filter(TeamApplication.team_id == team_id).all()
+    return stream_json_array(
+        select(*TeamApplication.__table__.c)
+        .where(TeamApplication.team_id == team_id),
+        TeamApplicationResponse,
+    )
 
 
 @router.post("/applications/{application_id}/approve", response_model=TeamApplicationResponse)
 async def approve_application(
     application_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Approve a player application (Captain only)"""
-    application = db.query(TeamApplication).filter(TeamApplication.id == application_id).first()
-    if not application:
-        raise HTTPException(status_code=404, detail="Application not found")
-    
-    team = db.query(Team).filter(Team.id == application.team_id).first()
-    if team.captain_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only the team captain can approve applications"
+    # One statement: lock the still-pending application, bump the captain's
+    # team (auto-marking the squad full once max is reached), then accept
+    # the application only if the team row was bumped. The team UPDATE
+    # re-checks is_squad_full under its row lock and FOR UPDATE re-checks
+    # the status, so concurrent approvals can't overfill the squad or
+    # count the same application twice.
+    pending = (
+        select(TeamApplication.team_id)
+        .where(
+            TeamApplication.id == application_id,
+            TeamApplication.status == ApplicationStatus.PENDING,
         )
-    
-    if team.is_squad_full:
+        .with_for_update()
+        .cte("pending_application")
+    )
+    new_count = func.coalesce(Team.current_player_count, 0) + 1
+    bumped_team = (
+        update(Team)
+        .where(
+            Team.id == select(pending.c.team_id).scalar_subquery(),
+            Team.captain_id == current_user.id,
+            Team.is_squad_full.isnot(True),
+        )
+        .values(
+            current_player_count=new_count,
+            is_squad_full=new_count >= Team.max_players,
+        )
+        .returning(Team.id)
+        .cte("bumped_team")
+    )
+    stmt = (
+        update(TeamApplication)
+        .where(
+            TeamApplication.id == application_id,
+            TeamApplication.team_id.in_(select(bumped_team.c.id)),
+        )
+        .values(status=ApplicationStatus.ACCEPTED)
+        .returning(TeamApplication)
+        .add_cte(pending, bumped_team)
+    )
+    application = (await db.execute(stmt)).scalar_one_or_none()
+    
+    if application is None:
+        # Nothing was written; work out which precondition failed
+        row = (
+            await db.execute(
+                select(Team.captain_id, Team.is_squad_full, TeamApplication.status)
+                .join(TeamApplication, TeamApplication.team_id == Team.id)
+                .where(TeamApplication.id == application_id)
+            )
+        ).one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Application not found")
+        if row.captain_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only the team captain can approve applications"
+            )
+        if row.status != ApplicationStatus.PENDING:
+            raise HTTPException(status_code=400, detail="Application has already been responded to")
         raise HTTPException(status_code=400, detail="Team squad is full")
     
-    application.status = ApplicationStatus.ACCEPTED
-    team.current_player_count += 1
-    
-    # Auto-mark squad as full if max reached
-    if team.current_player_count >= team.max_players:
-        team.is_squad_full = True
-    
-    db.commit()
-    db.refresh(application)
+    await db.commit()
     return application
 
 
 @router.post("/applications/{application_id}/reject", response_model=TeamApplicationResponse)
 async def reject_application(
     application_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Reject a player application (Captain only)"""
-    application = db.query(TeamApplication).filter(TeamApplication.id == application_id).first()
-    if not application:
-        raise HTTPException(status_code=404, detail="Application not found")
-    
-    team = db.query(Team).filter(Team.id == application.team_id).first()
-    if team.captain_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only the team captain can reject applications"
+    stmt = (
+        update(TeamApplication)
+        .where(
+            TeamApplication.id == application_id,
+            _captains_team(TeamApplication.team_id, current_user.id),
+        )
+        .values(status=ApplicationStatus.REJECTED)
+        .returning(TeamApplication)
+    )
+    application = (await db.execute(stmt)).scalar_one_or_none()
+    if application is None:
+        raise await _not_captain_error(
+            db, exists().where(TeamApplication.id == application_id),
+            "Application not found", "Only the team captain can reject applications"
         )
     
-    application.status = ApplicationStatus.REJECTED
-    db.commit()
-    db.refresh(application)
+    await db.commit()
     return application
@@ -1,18 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
 from typing import List
 
-from database import get_db
+from database import get_async_db
 from models import User
-from schemas import UserResponse, UserUpdate, UserOnboardingUpdate
-from auth import get_current_user
+from schemas import UserResponse, UserUpdate, UserOnboardingUpdate, sent_fields
+from etag import weak_etag, not_modified, set_etag
+from auth import get_current_user, get_current_principal, invalidate_cached_principal, CurrentPrincipal
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_my_profile(current_user: User = Depends(get_current_user)):
-    """Get current user's profile."""
+async def get_my_profile(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    """Get current user's profile.
+    
+    Repeat polls with a matching If-None-Match get a 304 instead of the body.
+    """
+    etag = weak_etag(current_user.id, current_user.updated_at, current_user.last_login)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
     return current_user
 
 
@@ -20,17 +35,17 @@ async def get_my_profile(current_user: User = Depends(get_current_user)):
 async def update_my_profile(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update current user's profile."""
     
     # Update user fields
-    update_data = user_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
+    for field, value in sent_fields(user_update).items():
         setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    # Roles are part of the cached principal
+    invalidate_cached_principal(current_user.id)
     
     return current_user
 
@@ -39,29 +54,31 @@ async def update_my_profile(
 async def complete_onboarding(
     onboarding_data: UserOnboardingUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Complete user onboarding by setting roles and location."""
     
     current_user.roles = onboarding_data.roles
     current_user.city = onboarding_data.city
+    current_user.latitude = onboarding_data.latitude
+    current_user.longitude = onboarding_data.longitude
     current_user.discovery_radius = onboarding_data.discovery_radius
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    invalidate_cached_principal(current_user.id)
     
     return current_user
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
-    user_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    user_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentPrincipal = Depends(get_current_principal)
 ):
     """Get a user by ID."""
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,31 +91,39 @@ async def get_user_by_id(
 @router.patch("/me/visibility", response_model=UserResponse)
 async def toggle_profile_visibility(
     profile_visible: bool,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Toggle profile visibility in feeds (pause/unpause profile)."""
     
-    current_user.profile_visible = profile_visible
-    db.commit()
-    db.refresh(current_user)
+    # Write and read back the row in one round-trip
+    stmt = (
+        update(User)
+        .where(User.id == current_user.id)
+        .values(profile_visible=profile_visible)
+        .returning(User)
+    )
+    user = (await db.execute(stmt)).scalar_one_or_none()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    await db.commit()
     
-    return current_user
+    return user
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_my_account(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Permanently delete the current user's account."""
     
-    # Delete user's refresh tokens first
-    from models import RefreshToken
-    db.query(RefreshToken).filter(RefreshToken.user_id == current_user.id).delete()
-    
-    # Delete the user
-    db.delete(current_user)
-    db.commit()
+    # Refresh tokens and other dependent rows go with it via ON DELETE CASCADE
+    await db.execute(delete(User).where(User.id == current_user.id))
+    await db.commit()
+    invalidate_cached_principal(current_user.id)
     
     return None
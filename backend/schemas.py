@@ -1,10 +1,19 @@
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_validator
 from typing import Optional, List, Dict
 from datetime import datetime, date
 from uuid import UUID
 from models import UserRole, AuthProvider, ApplicationStatus, InvitationStatus, SkillLevel, PlayingRole
 
 
+def sent_fields(model: BaseModel) -> dict:
+    """The fields the client actually sent, with their validated values.
+    
+    Same result as model_dump(exclude_unset=True) for the flat update
+    schemas, without walking every declared field.
+    """
+    return {name: getattr(model, name) for name in model.model_fields_set}
+
+
 # Auth Schemas
 class Token(BaseModel):
     access_token: str
@@ -15,6 +24,7 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     user_id: Optional[UUID] = None
     email: Optional[str] = None
+    jti: Optional[UUID] = None
 
 
 class RefreshTokenRequest(BaseModel):
@@ -27,6 +37,24 @@ class UserBase(BaseModel):
     full_name: Optional[str] = None
 
 
+class _PlayerFieldsUpdate(BaseModel):
+    """Cricket profile fields a player can change, shared by the update schemas."""
+    playing_role: Optional[str] = None
+    batting_style: Optional[str] = None
+    bowling_style: Optional[str] = None
+    experience_years: Optional[int] = None
+    preferred_formats: Optional[List[str]] = None
+
+
+class _PlayerFields(BaseModel):
+    """Cricket profile fields as shown on profiles and swipe cards."""
+    playing_role: Optional[str] = None
+    batting_style: Optional[str] = None
+    bowling_style: Optional[str] = None
+    experience_years: Optional[int] = None
+    preferred_formats: List[str] = []
+
+
 class UserCreate(UserBase):
     password: str = Field(..., min_length=8)
     roles: List[UserRole] = Field(default=[UserRole.PLAYER])
@@ -42,20 +70,17 @@ class GoogleOAuthRequest(BaseModel):
     redirect_uri: str
 
 
-class UserUpdate(BaseModel):
+class UserUpdate(_PlayerFieldsUpdate):
+    model_config = ConfigDict(extra='forbid')
+    
     full_name: Optional[str] = None
     phone: Optional[str] = None
     city: Optional[str] = None
     discovery_radius: Optional[int] = None
-    latitude: Optional[str] = None
-    longitude: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     avatar_url: Optional[str] = None
     roles: Optional[List[UserRole]] = None
-    batting_style: Optional[str] = None
-    bowling_style: Optional[str] = None
-    playing_role: Optional[str] = None
-    experience_years: Optional[int] = None
-    preferred_formats: Optional[List[str]] = None
     profile_visible: Optional[bool] = None
     is_available: Optional[bool] = None
 
@@ -68,8 +93,8 @@ class UserResponse(UserBase):
     phone: Optional[str] = None
     city: Optional[str] = None
     discovery_radius: int
-    latitude: Optional[str] = None
-    longitude: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     roles: List[str]
     batting_style: Optional[str] = None
     bowling_style: Optional[str] = None
@@ -90,8 +115,8 @@ class UserResponse(UserBase):
 class UserOnboardingUpdate(BaseModel):
     roles: List[UserRole]
     city: str
-    latitude: Optional[str] = None
-    longitude: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     discovery_radius: int = Field(default=25, ge=5, le=100)  # in miles
 
 
@@ -215,6 +240,11 @@ class TeamInvitationCreate(BaseModel):
     message: Optional[str] = None
 
 
+class TeamInvitationBulkCreate(BaseModel):
+    player_ids: List[UUID] = Field(..., min_length=1, max_length=50)
+    message: Optional[str] = None
+
+
 class TeamInvitationUpdate(BaseModel):
     status: InvitationStatus
 
@@ -234,50 +264,47 @@ class TeamInvitationResponse(BaseModel):
 
 
 # Player Profile Schema
-class PlayerProfileResponse(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
+class PlayerProfileResponse(_PlayerFields):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
     
     id: UUID
     full_name: Optional[str] = None
     email: str
     avatar_url: Optional[str] = None
     city: Optional[str] = None
-    playing_role: Optional[str] = None
-    batting_style: Optional[str] = None
-    bowling_style: Optional[str] = None
-    experience_years: Optional[int] = None
-    preferred_formats: List[str] = []
     is_available: bool
     past_tournaments: List[dict] = []
 
 
-class PlayerProfileUpdate(BaseModel):
-    playing_role: Optional[str] = None
-    batting_style: Optional[str] = None
-    bowling_style: Optional[str] = None
-    experience_years: Optional[int] = None
-    preferred_formats: Optional[List[str]] = None
+class PlayerProfileUpdate(_PlayerFieldsUpdate):
+    model_config = ConfigDict(extra='forbid')
     
 
 class AvailabilityToggle(BaseModel):
     is_available: bool
 
 
-VALID_DAYS = {"monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"}
-VALID_SLOTS = {"morning", "afternoon", "evening"}
+VALID_DAYS = frozenset({"monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"})
+VALID_SLOTS = frozenset({"morning", "afternoon", "evening"})
 
 
 class WeeklyAvailabilityUpdate(BaseModel):
     """Weekly schedule: each day maps to a list of time slots (morning/afternoon/evening)."""
     schedule: Dict[str, List[str]]
 
-    def model_post_init(self, __context):
-        for day, slots in self.schedule.items():
-            if day not in VALID_DAYS:
-                raise ValueError(f"Invalid day: {day}")
-            for slot in slots:
-                if slot not in VALID_SLOTS:
-                    raise ValueError(f"Invalid slot '{slot}' for {day}")
+    @field_validator("schedule")
+    @classmethod
+    def _check_schedule(cls, schedule: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        # Runs during validation, so bad input is a 422 rather than an error
+        # raised after the model was built
+        bad_days = schedule.keys() - VALID_DAYS
+        if bad_days:
+            raise ValueError(f"Invalid day: {', '.join(sorted(bad_days))}")
+        for day, slots in schedule.items():
+            bad_slots = set(slots) - VALID_SLOTS
+            if bad_slots:
+                raise ValueError(f"Invalid slot '{sorted(bad_slots)[0]}' for {day}")
+        return schedule
 
 
 class PlayerAvailabilityCreate(BaseModel):
@@ -297,25 +324,30 @@ class PlayerAvailabilityResponse(BaseModel):
     created_at: datetime
 
 
+class AvailabilityCalendarResponse(BaseModel):
+    """Weekly schedule plus date entries, for the availability screen in one call."""
+    weekly: Dict[str, List[str]]
+    dates: List[PlayerAvailabilityResponse]
+
+
 # ── Discovery / Swipe Feed Schemas ──────────────────────────────────────────
 
-class DiscoverPlayerCard(BaseModel):
+class DiscoverPlayerCard(_PlayerFields):
     """Minimal player info shown on a swipe card."""
-    id: str
+    model_config = ConfigDict(frozen=True)
+
+    id: UUID
     full_name: str
     avatar_url: Optional[str] = None
     city: Optional[str] = None
-    playing_role: Optional[str] = None
-    batting_style: Optional[str] = None
-    bowling_style: Optional[str] = None
-    experience_years: Optional[int] = None
-    preferred_formats: List[str] = []
     is_available: bool = True
 
 
 class DiscoverTeamCard(BaseModel):
     """Minimal team info shown on a swipe card."""
-    id: str
+    model_config = ConfigDict(frozen=True)
+
+    id: UUID
     name: str
     logo_url: Optional[str] = None
     city: Optional[str] = None
@@ -325,7 +357,7 @@ class DiscoverTeamCard(BaseModel):
     current_player_count: int = 0
     max_players: int = 15
     captain_name: Optional[str] = None
-    captain_id: Optional[str] = None
+    captain_id: Optional[UUID] = None
 
 
 # ── Chat Schemas ──────────────────────────────────────────────────────────────
@@ -335,26 +367,28 @@ class MessageCreate(BaseModel):
 
 
 class MessageOut(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
-    id: str
-    conversation_id: str
-    sender_id: str
+    id: UUID
+    conversation_id: UUID
+    sender_id: UUID
     content: str
     is_read: bool
     created_at: datetime
 
 
 class ConversationParticipant(BaseModel):
-    id: str
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: UUID
     full_name: Optional[str] = None
     avatar_url: Optional[str] = None
 
 
 class ConversationOut(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
-    id: str
+    id: UUID
     other_user: ConversationParticipant
     last_message: Optional[MessageOut] = None
     unread_count: int = 0
@@ -21,6 +21,8 @@ class PlayerRequirementCreate(BaseModel):
 
 
 class PlayerRequirementUpdate(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     required_role: Optional[PlayingRole] = None
     skill_level: Optional[SkillLevel] = None
     min_experience_years: Optional[int] = None
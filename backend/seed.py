@@ -1,15 +1,37 @@
 """
 Seed script: populates the database with test players and teams for swipe discovery.
-Safe to run multiple times — uses INSERT ... ON CONFLICT DO NOTHING.
+Safe to run multiple times — each table is loaded with one
+INSERT ... SELECT FROM jsonb_populate_recordset ... ON CONFLICT.
 """
+import os
+import time
 import uuid
-from datetime import datetime
+import orjson
 from database import engine
+from models import User, Team, UserRole, roles_to_mask
 from sqlalchemy import text
 
+_last_uuid7 = 0
+
+
+def _uuid7() -> str:
+    """A time-ordered UUIDv7, so seed ids land on the right edge of the pkey index."""
+    global _last_uuid7
+    # 48-bit millisecond timestamp followed by 74 random bits, kept strictly
+    # increasing when several ids share a millisecond
+    seq = ((time.time_ns() // 1_000_000) << 74) | int.from_bytes(os.urandom(10), "big") >> 6
+    seq = _last_uuid7 = max(seq, _last_uuid7 + 1)
+    return str(uuid.UUID(int=(
+        (seq >> 74) << 80
+        | 0x7 << 76
+        | ((seq >> 62) & 0xFFF) << 64
+        | 0b10 << 62
+        | seq & ((1 << 62) - 1)
+    )))
+
 SEED_USERS = [
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "email": "rahul.sharma@test.com",
         "full_name": "Rahul Sharma",
         "hashed_password": "$2b$12$placeholder",
@@ -28,7 +50,7 @@ SEED_USERS = [
         "profile_visible": True,
     },
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "email": "vikram.patel@test.com",
         "full_name": "Vikram Patel",
         "hashed_password": "$2b$12$placeholder",
@@ -47,7 +69,7 @@ SEED_USERS = [
         "profile_visible": True,
     },
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "email": "arjun.singh@test.com",
         "full_name": "Arjun Singh",
         "hashed_password": "$2b$12$placeholder",
@@ -66,7 +88,7 @@ SEED_USERS = [
         "profile_visible": True,
     },
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "email": "priya.menon@test.com",
         "full_name": "Priya Menon",
         "hashed_password": "$2b$12$placeholder",
@@ -85,7 +107,7 @@ SEED_USERS = [
         "profile_visible": True,
     },
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "email": "karan.mehta@test.com",
         "full_name": "Karan Mehta",
         "hashed_password": "$2b$12$placeholder",
@@ -104,7 +126,7 @@ SEED_USERS = [
         "profile_visible": True,
     },
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "email": "siddharth.rao@test.com",
         "full_name": "Siddharth Rao",
         "hashed_password": "$2b$12$placeholder",
@@ -124,7 +146,7 @@ SEED_USERS = [
     },
     # Seed captain user for team creation
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "email": "captain.demo@test.com",
         "full_name": "Demo Captain",
         "hashed_password": "$2b$12$placeholder",
@@ -143,7 +165,7 @@ SEED_USERS = [
         "profile_visible": True,
     },
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "email": "captain.pune@test.com",
         "full_name": "Aditya Kulkarni",
         "hashed_password": "$2b$12$placeholder",
@@ -162,7 +184,7 @@ SEED_USERS = [
         "profile_visible": True,
     },
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "email": "captain.delhi@test.com",
         "full_name": "Rajesh Gupta",
         "hashed_password": "$2b$12$placeholder",
@@ -187,7 +209,7 @@ captain_ids = {u["email"]: u["id"] for u in SEED_USERS if "CAPTAIN" in u["roles"
 
 SEED_TEAMS = [
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "name": "Mumbai Warriors",
         "description": "Professional cricket team looking for skilled all-rounders and fast bowlers. We compete in local T20 leagues.",
         "captain_id": captain_ids["captain.demo@test.com"],
@@ -201,7 +223,7 @@ SEED_TEAMS = [
         "is_active": True,
     },
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "name": "Pune Strikers",
         "description": "Competitive team seeking wicket-keepers and opening batsmen for the upcoming T20 season.",
         "captain_id": captain_ids["captain.pune@test.com"],
@@ -215,7 +237,7 @@ SEED_TEAMS = [
         "is_active": True,
     },
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "name": "Delhi Dynamites",
         "description": "Premier league team with a strong winning record. Looking for experienced spinners and top-order batsmen.",
         "captain_id": captain_ids["captain.delhi@test.com"],
@@ -229,7 +251,7 @@ SEED_TEAMS = [
         "is_active": True,
     },
     {
-        "id": str(uuid.uuid4()),
+        "id": _uuid7(),
         "name": "Bengaluru Blasters",
         "description": "Young and energetic team from the Silicon Valley of India. We play for passion and fun.",
         "captain_id": captain_ids["captain.demo@test.com"],  # reuse demo captain
@@ -245,59 +267,57 @@ SEED_TEAMS = [
 ]
 
 
+def _user_row(u):
+    """Column values for one SEED_USERS entry."""
+    row = {k: v for k, v in u.items() if k != "roles"}
+    row["roles_mask"] = roles_to_mask(UserRole[r] for r in u["roles"])
+    row.setdefault("bowling_style", None)
+    return row
+
+
+def _with_defaults(table, row):
+    """Fill in the model's scalar Python-side defaults that ``row`` leaves out."""
+    row = dict(row)
+    for column in table.c:
+        if column.key not in row and column.default is not None and column.default.is_scalar:
+            row[column.key] = column.default.arg
+    return row
+
+
+def _bulk_insert(conn, table, rows, on_conflict, returning="id"):
+    """Insert ``rows`` into ``table`` in one statement and return the RETURNING rows.
+    
+    The whole batch is sent as a single JSON parameter that Postgres expands
+    with jsonb_populate_recordset, taking each column's type from the
+    table's own row type.
+    """
+    rows = [_with_defaults(table, row) for row in rows]
+    columns = ", ".join(dict.fromkeys(k for row in rows for k in row))
+    return conn.execute(
+        text(
+            f"INSERT INTO {table.name} ({columns}) SELECT {columns} "
+            f"FROM jsonb_populate_recordset(NULL::{table.name}, CAST(:rows AS jsonb)) "
+            f"{on_conflict} RETURNING {returning}"
+        ),
+        {"rows": orjson.dumps(rows).decode()},
+    ).all()
+
+
 def seed():
     with engine.begin() as conn:
-        inserted_users = 0
-        for u in SEED_USERS:
-            roles_pg = "{" + ",".join(u["roles"]) + "}"
-            formats_pg = "{" + ",".join(u["preferred_formats"]) + "}"
-            result = conn.execute(text("""
-                INSERT INTO users (
-                    id, email, full_name, hashed_password, roles,
-                    playing_role, batting_style, bowling_style, experience_years,
-                    city, is_available, preferred_formats,
-                    avatar_url, auth_provider, is_verified, is_active, profile_visible,
-                    created_at, updated_at
-                ) VALUES (
-                    :id, :email, :full_name, :hashed_password, :roles,
-                    :playing_role, :batting_style, :bowling_style, :experience_years,
-                    :city, :is_available, :formats,
-                    :avatar_url, :auth_provider, :is_verified, :is_active, :profile_visible,
-                    NOW(), NOW()
-                )
-                ON CONFLICT (email) DO NOTHING
-            """), {
-                "id": u["id"],
-                "email": u["email"],
-                "full_name": u["full_name"],
-                "hashed_password": u["hashed_password"],
-                "roles": roles_pg,
-                "playing_role": u["playing_role"],
-                "batting_style": u["batting_style"],
-                "bowling_style": u.get("bowling_style"),
-                "experience_years": u["experience_years"],
-                "city": u["city"],
-                "is_available": u["is_available"],
-                "formats": formats_pg,
-                "avatar_url": u["avatar_url"],
-                "auth_provider": u["auth_provider"],
-                "is_verified": u["is_verified"],
-                "is_active": u["is_active"],
-                "profile_visible": u["profile_visible"],
-            })
-            inserted_users += result.rowcount
+        # The no-op DO UPDATE makes RETURNING include users that already
+        # existed, so captain IDs come back without a second query;
+        # xmax = 0 marks the rows this run actually inserted
+        users = _bulk_insert(
+            conn, User.__table__, [_user_row(u) for u in SEED_USERS],
+            "ON CONFLICT (email) DO UPDATE SET email = EXCLUDED.email",
+            returning="id, email, xmax = 0 AS inserted",
+        )
+        print(f"Inserted {sum(u.inserted for u in users)} users")
 
-        print(f"Inserted {inserted_users} users")
-
-        # Re-read captain IDs from DB in case they already existed
-        for u in SEED_USERS:
-            if "CAPTAIN" in u["roles"]:
-                row = conn.execute(
-                    text("SELECT id FROM users WHERE email = :email"),
-                    {"email": u["email"]}
-                ).fetchone()
-                if row:
-                    captain_ids[u["email"]] = str(row[0])
+        for row in users:
+            if row.email in captain_ids:
+                captain_ids[row.email] = str(row.id)
 
         # Update team captain_ids with refreshed values
         SEED_TEAMS[0]["captain_id"] = captain_ids["captain.demo@test.com"]
@@ -305,37 +325,11 @@ def seed():
         SEED_TEAMS[2]["captain_id"] = captain_ids["captain.delhi@test.com"]
         SEED_TEAMS[3]["captain_id"] = captain_ids["captain.demo@test.com"]
 
-        inserted_teams = 0
-        for t in SEED_TEAMS:
-            formats_pg = "{" + ",".join(t["preferred_formats"]) + "}"
-            result = conn.execute(text("""
-                INSERT INTO teams (
-                    id, name, description, captain_id, city, home_ground,
-                    preferred_formats, logo_url, max_players, current_player_count,
-                    is_squad_full, is_active, created_at, updated_at
-                ) VALUES (
-                    :id, :name, :description, :captain_id, :city, :home_ground,
-                    :formats, :logo_url, :max_players, :current_player_count,
-                    :is_squad_full, :is_active, NOW(), NOW()
-                )
-                ON CONFLICT (id) DO NOTHING
-            """), {
-                "id": t["id"],
-                "name": t["name"],
-                "description": t["description"],
-                "captain_id": t["captain_id"],
-                "city": t["city"],
-                "home_ground": t["home_ground"],
-                "formats": formats_pg,
-                "logo_url": t["logo_url"],
-                "max_players": t["max_players"],
-                "current_player_count": t["current_player_count"],
-                "is_squad_full": t["is_squad_full"],
-                "is_active": t["is_active"],
-            })
-            inserted_teams += result.rowcount
-
-        print(f"Inserted {inserted_teams} teams")
+        inserted = _bulk_insert(
+            conn, Team.__table__, SEED_TEAMS,
+            "ON CONFLICT (id) DO NOTHING",
+        )
+        print(f"Inserted {len(inserted)} teams")
 
     print("Seed complete.")
 
@@ -0,0 +1,37 @@
+from typing import Dict, Optional, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.sql import Select
+
+from database import AsyncSessionLocal
+
+# Rows fetched per round-trip from the server-side cursor
+STREAM_BATCH_SIZE = 50
+
+
+def stream_json_array(
+    stmt: Select,
+    model: Type[BaseModel],
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """Stream the rows of ``stmt`` as a JSON array of ``model``.
+    
+    Rows are read through a server-side cursor in STREAM_BATCH_SIZE batches
+    and serialized one at a time, so memory stays flat however large the
+    page is. The generator opens its own session: request-scoped sessions
+    are closed before a streaming body starts.
+    """
+    async def generate():
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(
+                stmt.execution_options(yield_per=STREAM_BATCH_SIZE)
+            )
+            yield b"["
+            separator = b""
+            async for row in result:
+                yield separator + model.model_validate(row).model_dump_json().encode()
+                separator = b","
+            yield b"]"
+
+    return StreamingResponse(generate(), media_type="application/json", headers=headers)
@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from auth import get_current_principal
+from database import get_async_db
+
+
+async def _no_db():
+    yield None
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_principal] = lambda: None
+    app.dependency_overrides[get_async_db] = _no_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_invalid_weekly_schedule_day_is_422(client):
+    # A field_validator's ValueError ends up in the error's ctx
+    response = client.put(
+        "/players/me/availability/weekly",
+        json={"schedule": {"funday": ["morning"]}},
+    )
+    assert response.status_code == 422
+    (error,) = response.json()["detail"]
+    assert error["loc"] == ["body", "schedule"]
+    assert "Invalid day: funday" in error["msg"]
+
+
+def test_invalid_weekly_schedule_slot_is_422(client):
+    response = client.put(
+        "/players/me/availability/weekly",
+        json={"schedule": {"monday": ["midnight"]}},
+    )
+    assert response.status_code == 422
+    assert "Invalid slot 'midnight' for monday" in response.json()["detail"][0]["msg"]
@@ -168,8 +168,8 @@ export interface User {
   phone?: string;
   city?: string;
   discovery_radius: number;
-  latitude?: string;
-  longitude?: string;
+  latitude?: number;
+  longitude?: number;
   roles: string[];
   batting_style?: string;
   bowling_style?: string;
@@ -215,8 +215,8 @@ export interface UserUpdate {
   phone?: string;
   city?: string;
   discovery_radius?: number;
-  latitude?: string;
-  longitude?: string;
+  latitude?: number;
+  longitude?: number;
   avatar_url?: string;
   roles?: string[];
   batting_style?: string;
@@ -230,8 +230,8 @@ export interface UserUpdate {
 export interface OnboardingData {
   roles: string[];
   city: string;
-  latitude?: string;
-  longitude?: string;
+  latitude?: number;
+  longitude?: number;
   discovery_radius: number;
 }
 
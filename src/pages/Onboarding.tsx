@@ -28,8 +28,8 @@ const Onboarding = () => {
   const [step, setStep] = useState<Step>("role");
   const [selectedRoles, setSelectedRoles] = useState<Role[]>([]);
   const [city, setCity] = useState("");
-  const [latitude, setLatitude] = useState<string>();
-  const [longitude, setLongitude] = useState<string>();
+  const [latitude, setLatitude] = useState<number>();
+  const [longitude, setLongitude] = useState<number>();
   const [radius, setRadius] = useState([25]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
@@ -83,8 +83,9 @@ const Onboarding = () => {
   const handleLocationChange = (value: string, lat?: string, lng?: string) => {
     setCity(value);
     if (lat && lng) {
-      setLatitude(lat);
-      setLongitude(lng);
+      // Suggestions carry coordinates as strings; the API takes numbers
+      setLatitude(Number(lat));
+      setLongitude(Number(lng));
     }
   };
 